@@ -0,0 +1,173 @@
+"""
+Benchmark of hks_pylib asymmetric primitives.\n
+Measure the operations per second of:
+- ciphers: key generation, encryption and decryption of RSACipher,
+RSAEnvelopeCipher and X25519Cipher.
+- signatures: signing, verification and batch verification (verify_many)
+of Ed25519, ECDSA (P-256) and RSA-PSS (2048 bits).
+- handshakes: complete DiffieHellmanExchange handshakes (two parties,
+exchange and derive_key) in the FFDH and X25519 modes.\n
+Example:
+    python benchmarks/asymmetrics.py --output asymmetrics.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Callable, Dict, List
+
+from hks_pylib.cryptography.ciphers.asymmetrics import RSAKey, RSACipher, X25519Key
+from hks_pylib.cryptography.ciphers.envelope import RSAEnvelopeCipher, X25519Cipher
+from hks_pylib.cryptography.ciphers.signatures import Ed25519Key, ECDSAKey
+from hks_pylib.cryptography.ciphers.signatures import sign, verify, verify_many
+from hks_pylib.cryptography.protocols import DiffieHellmanExchange, KeyExchangeMode
+
+
+MESSAGE_SIZES = [32, 1024]
+BATCH_SIZE = 256
+
+
+def ops_per_second(func: Callable[[], object], min_time: float) -> float:
+    rounds = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        rounds += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return rounds / elapsed
+
+
+def _rsa_key(keysize: int) -> RSAKey:
+    rsakey = RSAKey()
+    rsakey.generate(keysize)
+    return rsakey
+
+
+def _x25519_key() -> X25519Key:
+    key = X25519Key()
+    key.generate()
+    return key
+
+
+def bench_ciphers(min_time: float) -> List[Dict]:
+    rsa2048, rsa4096, x25519 = _rsa_key(2048), _rsa_key(4096), _x25519_key()
+    cases = {
+        "RSACipher-2048": (lambda: _rsa_key(2048), lambda: RSACipher(rsa2048)),
+        "RSACipher-4096": (lambda: _rsa_key(4096), lambda: RSACipher(rsa4096)),
+        "RSAEnvelopeCipher-2048": (lambda: _rsa_key(2048), lambda: RSAEnvelopeCipher(rsa2048)),
+        "X25519Cipher": (_x25519_key, lambda: X25519Cipher(x25519)),
+    }
+
+    results = []
+    for name, (keygen, new_cipher) in cases.items():
+        results.append({"case": name, "operation": "keygen", "size": 0,
+            "ops_per_second": ops_per_second(keygen, min_time)})
+
+        cipher = new_cipher()
+        for size in MESSAGE_SIZES:
+            plaintext = os.urandom(size)
+            cipher.reset()
+            ciphertext = cipher.encrypt(plaintext)
+
+            def encrypt():
+                cipher.reset()
+                cipher.encrypt(plaintext)
+
+            def decrypt():
+                cipher.reset()
+                cipher.decrypt(ciphertext)
+
+            for operation, func in (("encrypt", encrypt), ("decrypt", decrypt)):
+                results.append({"case": name, "operation": operation, "size": size,
+                    "ops_per_second": ops_per_second(func, min_time)})
+
+    return results
+
+
+def bench_signatures(min_time: float) -> List[Dict]:
+    ed25519_key, ecdsa_key = Ed25519Key(), ECDSAKey()
+    ed25519_key.generate()
+    ecdsa_key.generate()
+    cases = {
+        "Ed25519": ed25519_key,
+        "ECDSA-P256": ecdsa_key,
+        "RSA-PSS-2048": _rsa_key(2048),
+    }
+
+    results = []
+    message = os.urandom(MESSAGE_SIZES[0])
+    for name, key in cases.items():
+        signature = sign(key, message)
+        batch = [(message, signature, key)] * BATCH_SIZE
+        funcs = {
+            "sign": lambda: sign(key, message),
+            "verify": lambda: verify(key, message, signature),
+            # The number of batches per second is converted to signatures per second.
+            "verify_many-1": lambda: verify_many(batch, 1),
+            "verify_many-4": lambda: verify_many(batch, 4),
+        }
+
+        for operation, func in funcs.items():
+            rate = ops_per_second(func, min_time)
+            if operation.startswith("verify_many"):
+                rate *= BATCH_SIZE
+
+            results.append({"case": name, "operation": operation,
+                "size": len(message), "ops_per_second": rate})
+
+    return results
+
+
+def _handshake(mode: KeyExchangeMode) -> bytes:
+    client = DiffieHellmanExchange(mode=mode)
+    server = DiffieHellmanExchange(mode=mode)
+
+    client_public_key, server_public_key = client.public_key, server.public_key
+    server.derive_key(server.exchange(client_public_key), 32)
+    return client.derive_key(client.exchange(server_public_key), 32)
+
+
+def bench_handshakes(min_time: float) -> List[Dict]:
+    results = []
+    for mode in (KeyExchangeMode.FFDH, KeyExchangeMode.X25519):
+        results.append({"case": "DiffieHellmanExchange-" + mode.name, "operation": "handshake",
+            "size": 0, "ops_per_second": ops_per_second(lambda: _handshake(mode), min_time)})
+
+    return results
+
+
+BENCHMARKS = {
+    "ciphers": bench_ciphers,
+    "signatures": bench_signatures,
+    "handshakes": bench_handshakes,
+}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark hks_pylib asymmetric primitives.")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--min-time", type=float, default=0.5,
+        help="the minimum measured time (in seconds) of each case")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.benchmarks:
+        for result in BENCHMARKS[name](args.min_time):
+            result["benchmark"] = name
+            results.append(result)
+            print("{benchmark:>10} {case:>24} {operation:>14} {size:>6} B: "
+                "{ops_per_second:12.1f} ops/s".format(**result), file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Throughput benchmark of hks_pylib ciphers.\n
+Measure MB/s, ops/s and the peak memory (traced by tracemalloc) of
+encryption and decryption for many message sizes, in one-shot mode
+(encrypt(data)) and streamed mode (encrypt(chunk, finalize=False) per
+chunk, then finalize()).\n
+Examples:
+    python benchmarks/ciphers.py --max-size 1M --output bench.json
+    python benchmarks/ciphers.py --max-size 1M --baseline bench.json --tolerance 0.2
+The second command exits with status 1 if any MB/s drops by more than
+20% compared to the baseline, so it can be used to flag regressions in CI.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List
+
+from hks_pylib.cryptography.ciphers import HKSCipher
+from hks_pylib.cryptography.ciphers.asymmetrics import RSAKey, RSACipher
+from hks_pylib.cryptography.ciphers.symmetrics import NoCipher, XorCipher
+from hks_pylib.cryptography.ciphers.symmetrics import AES_CTR, AES_CBC, HybridCipher
+
+
+AES_KEY = os.urandom(32)
+
+SIZES = [16, 1024, 64 * 1024, 1024 * 1024, 16 * 1024 * 1024, 256 * 1024 * 1024]
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# RSACipher needs one OAEP operation per ~200 bytes, the larger sizes
+# would take hours.
+RSA_MAX_SIZE = 64 * 1024
+
+
+def _rsa_cipher() -> RSACipher:
+    rsakey = RSAKey()
+    rsakey.generate(2048)
+    return RSACipher(rsakey)
+
+
+CIPHERS: Dict[str, Callable[[], HKSCipher]] = {
+    "NoCipher": NoCipher,
+    "XorCipher": lambda: XorCipher(os.urandom(32)),
+    "AES_CTR": lambda: AES_CTR(AES_KEY),
+    "AES_CBC": lambda: AES_CBC(AES_KEY),
+    "HybridCipher": lambda: HybridCipher(AES_CBC(AES_KEY)),
+    "RSACipher": _rsa_cipher,
+}
+
+
+def parse_size(size: str) -> int:
+    units = {"K": 1024, "M": 1024 * 1024, "G": 1024 * 1024 * 1024}
+    size = size.strip().upper()
+    if size and size[-1] in units:
+        return int(size[:-1]) * units[size[-1]]
+
+    return int(size)
+
+
+def run_once(cipher: HKSCipher, data: bytes, operation: str, mode: str) -> bytes:
+    cipher.reset(False)
+    process = cipher.encrypt if operation == "encrypt" else cipher.decrypt
+
+    if mode == "oneshot":
+        return process(data)
+
+    view = memoryview(data)
+    output = []
+    for start in range(0, len(view), STREAM_CHUNK_SIZE):
+        output.append(process(view[start : start + STREAM_CHUNK_SIZE], finalize=False))
+    output.append(cipher.finalize())
+    return b"".join(output)
+
+
+def measure(cipher: HKSCipher, data: bytes, operation: str, mode: str, min_time: float) -> Dict:
+    tracemalloc.start()
+    run_once(cipher, data, operation, mode)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rounds = 0
+    start = time.perf_counter()
+    while True:
+        run_once(cipher, data, operation, mode)
+        rounds += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+
+    return {
+        "ops_per_second": rounds / elapsed,
+        "mb_per_second": len(data) * rounds / elapsed / 1e6,
+        "peak_memory": peak_memory,
+    }
+
+
+def run_benchmark(names: List[str], max_size: int, min_time: float) -> List[Dict]:
+    results = []
+    for name in names:
+        cipher = CIPHERS[name]()
+        cipher.reset()
+        for size in SIZES:
+            if size > max_size or (name == "RSACipher" and size > RSA_MAX_SIZE):
+                continue
+
+            plaintext = os.urandom(size)
+            ciphertext = run_once(cipher, plaintext, "encrypt", "oneshot")
+            for mode in ("oneshot", "stream"):
+                for operation, data in (("encrypt", plaintext), ("decrypt", ciphertext)):
+                    result = {"cipher": name, "size": size, "mode": mode, "operation": operation}
+                    result.update(measure(cipher, data, operation, mode, min_time))
+                    results.append(result)
+                    print("{cipher:>12} {operation:>7} {mode:>7} {size:>10} B: "
+                        "{mb_per_second:10.2f} MB/s {ops_per_second:12.1f} ops/s "
+                        "{peak_memory:>12} B peak".format(**result), file=sys.stderr)
+
+    return results
+
+
+def _key(result: Dict) -> tuple:
+    return (result["cipher"], result["size"], result["mode"], result["operation"])
+
+
+def find_regressions(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    "Return the messages of results whose MB/s is lower than (1 - tolerance) * baseline."
+    baseline = {_key(result): result for result in baseline}
+
+    regressions = []
+    for result in results:
+        expected = baseline.get(_key(result))
+        if expected is None:
+            continue
+
+        if result["mb_per_second"] < (1 - tolerance) * expected["mb_per_second"]:
+            regressions.append("{} {} {} {} B: {:.2f} MB/s (baseline {:.2f} MB/s)".format(
+                result["cipher"], result["operation"], result["mode"], result["size"],
+                result["mb_per_second"], expected["mb_per_second"]
+            ))
+
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark hks_pylib ciphers.")
+    parser.add_argument("--ciphers", nargs="+", choices=list(CIPHERS), default=list(CIPHERS))
+    parser.add_argument("--max-size", type=parse_size, default=SIZES[-1],
+        help="the largest message size, e.g. 16, 64K, 256M (default: 256M)")
+    parser.add_argument("--min-time", type=float, default=0.2,
+        help="the minimum measured time (in seconds) of each case")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+        help="the allowed relative drop of MB/s compared to the baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.ciphers, args.max_size, args.min_time)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for regression in regressions:
+            print("REGRESSION: " + regression, file=sys.stderr)
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,12 @@
+import os
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+
 from hkserror.hkserror import HFormatError
 from hks_pylib.math import ceil_div
+from hks_pylib.utils import BytesLike, is_bytes_like
 from hks_pylib.hksenum import HKSEnum
 
 from hks_pylib.cryptography.ciphers.cipherid import CipherID
@@ -10,6 +17,7 @@ from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import x25519
 
 from hkserror import HTypeError
 from hks_pylib.errors.cryptography import ResetError
@@ -24,7 +32,57 @@ class Encoding(HKSEnum):
     DER = serialization.Encoding.DER
 
 
-class RSAKey(object):
+KEY_CACHE_SIZE = 128
+
+
+class _KeyCache(object):
+    "A thread-safe LRU cache of deserialized keys, keyed by the fingerprint of their bytes."
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(*parts: bytes) -> bytes:
+        digest = hashlib.sha256()
+        for part in parts:
+            if part is None:
+                digest.update(b"\x00")
+            else:
+                digest.update(b"\x01" + struct.pack(">Q", len(part)) + part)
+
+        return digest.digest()
+
+    def get(self, fingerprint: bytes):
+        with self._lock:
+            key = self._keys.get(fingerprint)
+            if key is not None:
+                self._keys.move_to_end(fingerprint)
+
+            return key
+
+    def put(self, fingerprint: bytes, key) -> None:
+        with self._lock:
+            self._keys[fingerprint] = key
+            self._keys.move_to_end(fingerprint)
+            while len(self._keys) > self._max_size:
+                self._keys.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+
+
+class AsymmetricKey(object):
+    """Abstract class: NEVER USE.\n
+    The deserialized keys are cached (at most KEY_CACHE_SIZE keys) by the
+    fingerprint of their bytes and password, so deserializing the same
+    (encrypted) key again does not repeat the parsing and the KDF."""
+    PRIVATE_KEY_TYPE = None
+    PUBLIC_KEY_TYPE = None
+
+    _cache = _KeyCache(KEY_CACHE_SIZE)
+
     def __init__(self, encoding: Encoding = Encoding.PEM) -> None:
         super().__init__()
         if not isinstance(encoding, Encoding):
@@ -34,56 +92,47 @@ class RSAKey(object):
         self.__private_key = None
         self.__public_key = None
 
-    def generate(self, keysize: int, e: int = 65537):
-        if not isinstance(keysize, int):
-            raise HTypeError("keysize", keysize, int)
+    def generate(self, *args, **kwargs):
+        raise NotImplementedError()
 
-        if not isinstance(e, int):
-            raise HTypeError("e", e, int)
+    def _set_private_key(self, private_key) -> None:
+        if not isinstance(private_key, self.PRIVATE_KEY_TYPE):
+            raise KeyError("Expected a private key of {}.".format(type(self).__name__))
 
-        if keysize < 1024:
-            raise HFormatError("Expected a larger rsa key (>=1024 bytes).")
+        self.__private_key = private_key
+        self.__public_key = private_key.public_key()
 
-        self.__private_key = rsa.generate_private_key(
-                public_exponent=e,
-                key_size=keysize,
-                backend=default_backend()
-            )
-        
-        self.__public_key = self.__private_key.public_key()
+    def _set_public_key(self, public_key) -> None:
+        if not isinstance(public_key, self.PUBLIC_KEY_TYPE):
+            raise KeyError("Expected a public key of {}.".format(type(self).__name__))
 
-    def private_key(self) -> rsa.RSAPrivateKeyWithSerialization:
-        return self.__private_key
-    
-    def public_key(self) -> rsa.RSAPublicKeyWithSerialization:
-        return self.__public_key
+        self.__public_key = public_key
 
-    def key_size(self):
-        if not self.__private_key and not self.__public_key:
-            raise KeyError("Please import (generate/load/deserialize) "
-            "a key before getting key_size.")
-    
-        if self.__private_key:
-            return self.__private_key.key_size
+    def _private_format(self, password: bytes) -> serialization.PrivateFormat:
+        return serialization.PrivateFormat.PKCS8
 
-        if self.__public_key:
-            return self.__public_key.key_size
+    def private_key(self):
+        return self.__private_key
+
+    def public_key(self):
+        return self.__public_key
 
     def serialize_private_key(self, password: bytes = None):
         if password is None:
-            _format = serialization.PrivateFormat.TraditionalOpenSSL
             encryption_algorithm = serialization.NoEncryption()
         else:
-            _format = serialization.PrivateFormat.PKCS8
             encryption_algorithm = serialization.BestAvailableEncryption(password)
 
         return self.__private_key.private_bytes(
             encoding=self._encoding.value,
-            format=_format,
+            format=self._private_format(password),
             encryption_algorithm=encryption_algorithm
         )
 
-    def deserialize_private_key(self, data: bytes, password: bytes = None):
+    def deserialize_private_key(self, data: bytes, password: bytes = None, cache: bool = True):
+        """Load the private key from data. The loaded keys are cached by the
+        fingerprint of data, set cache to False for the keys which are only
+        loaded once (e.g. the freshly generated keys)."""
         if self._encoding.value == serialization.Encoding.PEM:
             _load_private_key = serialization.load_pem_private_key
         elif self._encoding.value == serialization.Encoding.DER:
@@ -91,11 +140,18 @@ class RSAKey(object):
         else:
             raise EncodingError("Invalid encoding ({}), please choose an encoding in "
             "hks_pylib.cryptography.ciphers.asymmetrics.Encoding.".format(self._encoding))
-        
-        self.__private_key = _load_private_key(
-            data=data,
-            password=password,
-        )
+
+        if not cache:
+            self._set_private_key(_load_private_key(data=data, password=password))
+            return
+
+        fingerprint = _KeyCache.fingerprint(b"private", bytes(data), password)
+        private_key = AsymmetricKey._cache.get(fingerprint)
+        if private_key is None:
+            private_key = _load_private_key(data=data, password=password)
+            AsymmetricKey._cache.put(fingerprint, private_key)
+
+        self._set_private_key(private_key)
 
     def save_private_key(self, path, password: bytes = None):
         data = self.serialize_private_key(password)
@@ -112,7 +168,8 @@ class RSAKey(object):
             format=serialization.PublicFormat.SubjectPublicKeyInfo
         )
 
-    def deserialize_public_key(self, data: bytes):
+    def deserialize_public_key(self, data: bytes, cache: bool = True):
+        "Load the public key from data, see deserialize_private_key() for cache."
         if self._encoding.value == serialization.Encoding.PEM:
             _load_public_key = serialization.load_pem_public_key
         elif self._encoding.value == serialization.Encoding.DER:
@@ -121,7 +178,17 @@ class RSAKey(object):
             raise EncodingError("Invalid encoding ({}), please choose an encoding in "
             "hks_pylib.cryptography.ciphers.asymmetrics.Encoding.".format(self._encoding))
 
-        self.__public_key = _load_public_key(data=data)
+        if not cache:
+            self._set_public_key(_load_public_key(data=data))
+            return
+
+        fingerprint = _KeyCache.fingerprint(b"public", bytes(data))
+        public_key = AsymmetricKey._cache.get(fingerprint)
+        if public_key is None:
+            public_key = _load_public_key(data=data)
+            AsymmetricKey._cache.put(fingerprint, public_key)
+
+        self._set_public_key(public_key)
 
     def save_public_key(self, path):
         data = self.serialize_public_key()
@@ -132,12 +199,103 @@ class RSAKey(object):
         with open(path, "rb") as key_file:
             self.deserialize_public_key(key_file.read())
 
+    def _paths(self, directory: str):
+        extension = self._encoding.name.lower()
+        return (
+            os.path.join(directory, "private_key." + extension),
+            os.path.join(directory, "public_key." + extension)
+        )
+
     def save_all(self, directory: str, password: bytes = None):
-        raise NotImplementedError("Please implement save_all() when you have time.")
+        "Save the private key (if any) and the public key into the directory."
+        if not self.__private_key and not self.__public_key:
+            raise KeyError("Please import (generate/load/deserialize) "
+            "a key before saving it.")
+
+        os.makedirs(directory, exist_ok=True)
+        private_path, public_path = self._paths(directory)
+        if self.__private_key:
+            self.save_private_key(private_path, password)
+
+        self.save_public_key(public_path)
 
     def load_all(self, directory: str, password: bytes = None):
-        raise NotImplementedError("Please implement load_all() when you have time.")
-        
+        "Load the keys saved by save_all(), the private key is optional."
+        private_path, public_path = self._paths(directory)
+        if os.path.isfile(private_path):
+            self.load_private_key(private_path, password)
+        elif os.path.isfile(public_path):
+            self.load_public_key(public_path)
+        else:
+            raise KeyError("Not found any key in {}.".format(directory))
+
+    @staticmethod
+    def clear_cache():
+        "Remove all deserialized keys from the cache."
+        AsymmetricKey._cache.clear()
+
+
+class RSAKey(AsymmetricKey):
+    PRIVATE_KEY_TYPE = rsa.RSAPrivateKey
+    PUBLIC_KEY_TYPE = rsa.RSAPublicKey
+
+    def generate(self, keysize: int, e: int = 65537):
+        if not isinstance(keysize, int):
+            raise HTypeError("keysize", keysize, int)
+
+        if not isinstance(e, int):
+            raise HTypeError("e", e, int)
+
+        if keysize < 1024:
+            raise HFormatError("Expected a larger rsa key (>=1024 bytes).")
+
+        self._set_private_key(rsa.generate_private_key(
+                public_exponent=e,
+                key_size=keysize,
+                backend=default_backend()
+            ))
+
+    def private_key(self) -> rsa.RSAPrivateKeyWithSerialization:
+        return super().private_key()
+
+    def public_key(self) -> rsa.RSAPublicKeyWithSerialization:
+        return super().public_key()
+
+    def key_size(self):
+        if not self.private_key() and not self.public_key():
+            raise KeyError("Please import (generate/load/deserialize) "
+            "a key before getting key_size.")
+
+        if self.private_key():
+            return self.private_key().key_size
+
+        if self.public_key():
+            return self.public_key().key_size
+
+    def _private_format(self, password: bytes) -> serialization.PrivateFormat:
+        if password is None:
+            return serialization.PrivateFormat.TraditionalOpenSSL
+
+        return serialization.PrivateFormat.PKCS8
+
+
+class X25519Key(AsymmetricKey):
+    "A X25519 key pair, see X25519Cipher in the envelope module."
+    PRIVATE_KEY_TYPE = x25519.X25519PrivateKey
+    PUBLIC_KEY_TYPE = x25519.X25519PublicKey
+
+    def generate(self):
+        self._set_private_key(x25519.X25519PrivateKey.generate())
+
+    def private_key(self) -> x25519.X25519PrivateKey:
+        return super().private_key()
+
+    def public_key(self) -> x25519.X25519PublicKey:
+        return super().public_key()
+
+    def key_size(self):
+        return 256
+
 
 @CipherID.register
 class RSACipher(HKSCipher):
@@ -162,81 +320,97 @@ class RSACipher(HKSCipher):
         # https://crypto.stackexchange.com/questions/42097/what-is-the-maximum-size-of-the-plaintext-message-for-rsa-oaep
         self._max_plaintext_size = self._keysize - 2 * self._hash_algorithm.digest_size - 2
         
+        self._padding = padding.OAEP(
+            mgf=padding.MGF1(algorithm=self._hash_algorithm()),
+            algorithm=self._hash_algorithm(),
+            label=None
+        )
+
         self._data = None
 
     def _raw_encrypt(self, plaintext: bytes):
-        ciphertext = self._key.public_key().encrypt(
-                plaintext,
-                padding.OAEP(
-                        mgf=padding.MGF1(self._hash_algorithm()),
-                        algorithm=self._hash_algorithm(),
-                        label=None
-                    ),
-            )
-        return ciphertext
+        return self._key.public_key().encrypt(plaintext, self._padding)
 
     def _raw_decrypt(self, ciphertext: bytes):
-        plaintext = self._key.private_key().decrypt(
-            ciphertext,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=self._hash_algorithm()),
-                algorithm=self._hash_algorithm(),
-                label=None
-            )
-        )
-        return plaintext
+        return self._key.private_key().decrypt(ciphertext, self._padding)
+
+    def _process_chunks(self, data: BytesLike, chunk_size: int, max_output_size: int, raw) -> bytearray:
+        """Process all full chunks except the last one (which is kept for
+        finalize()) by walking an offset over a memoryview, and write the
+        results into a preallocated output."""
+        if self._data:
+            self._data += data
+            view = memoryview(self._data)
+        else:
+            view = memoryview(data).cast("B")
+
+        if len(view) <= chunk_size:
+            self._data = bytearray(view)
+            view.release()
+            return bytearray()
+
+        nchunks = (len(view) - 1) // chunk_size
+        output = bytearray(nchunks * max_output_size)
+        output_offset = 0
+        for offset in range(0, nchunks * chunk_size, chunk_size):
+            result = raw(bytes(view[offset : offset + chunk_size]))
+            output[output_offset : output_offset + len(result)] = result
+            output_offset += len(result)
 
-    def encrypt(self, plaintext: bytes, finalize: bool = True):
-        if not isinstance(plaintext, bytes):
-            raise HTypeError("plaintext", plaintext, bytes)
+        remaining = bytearray(view[nchunks * chunk_size : ])
+        view.release()
+        self._data = remaining
+
+        del output[output_offset:]
+        return output
+
+    def encrypt(self, plaintext: BytesLike, finalize: bool = True):
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
 
         if self._in_process is CipherProcess.NONE:
             self._in_process = CipherProcess.ENCRYPT
-            self._data = b""
+            self._data = bytearray()
 
         if self._in_process is not CipherProcess.ENCRYPT:
             raise ResetError("You are in {} process, please call reset() "
             "before calling encrypt().".format(self._in_process.name))
 
-        self._data += plaintext
-
-        ciphertext = b""
-        while len(self._data) > self._max_plaintext_size:
-            data_to_enc = self._data[ : self._max_plaintext_size]
-            self._data = self._data[self._max_plaintext_size : ]
-
-            ciphertext += self._raw_encrypt(data_to_enc)
+        ciphertext = self._process_chunks(
+            plaintext,
+            self._max_plaintext_size,
+            self._keysize,
+            self._raw_encrypt
+        )
 
         if finalize:
             ciphertext += self.finalize()
 
-        return ciphertext
+        return bytes(ciphertext)
 
-    def decrypt(self, ciphertext: bytes, finalize: bool = True):
-        if not isinstance(ciphertext, bytes):
-            raise HTypeError("ciphertext", ciphertext, bytes)
+    def decrypt(self, ciphertext: BytesLike, finalize: bool = True):
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
 
         if self._in_process is CipherProcess.NONE:
             self._in_process = CipherProcess.DECRYPT
-            self._data = b""
+            self._data = bytearray()
 
         if self._in_process is not CipherProcess.DECRYPT:
             raise ResetError("You are in {} process, please call reset() "
             "before calling decrypt().".format(self._in_process.name))
 
-        self._data += ciphertext
-
-        plaintext = b""
-        while len(self._data) > self._keysize:
-            data_to_dec = self._data[ : self._keysize]
-            self._data = self._data[self._keysize : ]
-
-            plaintext += self._raw_decrypt(data_to_dec)
+        plaintext = self._process_chunks(
+            ciphertext,
+            self._keysize,
+            self._max_plaintext_size,
+            self._raw_decrypt
+        )
 
         if finalize:
             plaintext += self.finalize()
 
-        return plaintext
+        return bytes(plaintext)
 
     def finalize(self) -> bytes:
         if self._in_process is CipherProcess.ENCRYPT:
@@ -245,7 +419,7 @@ class RSACipher(HKSCipher):
                 "large (expected <= {} bytes, but passed {} "
                 "bytes.)".format(self._max_plaintext_size, len(self._data)))
 
-            finaltext = self._raw_encrypt(self._data)
+            finaltext = self._raw_encrypt(bytes(self._data))
 
         elif self._in_process is CipherProcess.DECRYPT:            
             if len(self._data) > self._keysize:
@@ -253,7 +427,7 @@ class RSACipher(HKSCipher):
                 "large (expected <= {} bytes, but passed {} "
                 "bytes.)".format(self._keysize, len(self._data)))
 
-            finaltext = self._raw_decrypt(self._data)
+            finaltext = self._raw_decrypt(bytes(self._data))
 
         elif self._in_process is CipherProcess.FINALIZED:
             raise ResetError("Unknown process in your object "
@@ -276,4 +450,4 @@ class RSACipher(HKSCipher):
             raise FinalizeCipherError("Please finalize() the process before calling reset().")
 
         self._in_process = CipherProcess.NONE
-        self._data = b""
+        self._data = bytearray()
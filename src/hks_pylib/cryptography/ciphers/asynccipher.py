@@ -0,0 +1,87 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Callable
+
+from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+
+from hks_pylib.utils import BytesLike, is_bytes_like
+from hks_pylib.cryptography.ciphers import HKSCipher
+
+
+class AsyncCipher(object):
+    """An asyncio adapter of a HKSCipher (including RSACipher).\n
+    The chunks whose size is at least offload_size bytes are processed in
+    the executor (the default executor of the event loop if it is None),
+    so they do not block the event loop. The smaller chunks are processed
+    inline. finalize() is offloaded only if offload_size is 0, which is
+    a good choice for expensive ciphers such as RSACipher.\n
+    The calls are serialized, the wrapped cipher MUST NOT be used
+    directly while an AsyncCipher is using it."""
+    DEFAULT_OFFLOAD_SIZE = 64 * 1024
+
+    def __init__(self,
+                cipher: HKSCipher,
+                offload_size: int = DEFAULT_OFFLOAD_SIZE,
+                executor: Executor = None
+            ) -> None:
+        if not isinstance(cipher, HKSCipher):
+            raise HTypeError("cipher", cipher, HKSCipher)
+
+        if not isinstance(offload_size, int):
+            raise HTypeError("offload_size", offload_size, int)
+
+        if executor is not None and not isinstance(executor, Executor):
+            raise HTypeError("executor", executor, Executor, None)
+
+        if offload_size < 0:
+            raise HFormatError("Parameter offload_size expected a non-negative integer.")
+
+        self._cipher = cipher
+        self._offload_size = offload_size
+        self._executor = executor
+
+        # The lock is created in the running event loop.
+        self._lock: asyncio.Lock = None
+
+    @property
+    def cipher(self) -> HKSCipher:
+        return self._cipher
+
+    async def _run(self, size: int, func: Callable, *args) -> Any:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if size < self._offload_size:
+                return func(*args)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def encrypt(self, plaintext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
+
+        size = memoryview(plaintext).nbytes
+        return await self._run(size, self._cipher.encrypt, plaintext, finalize)
+
+    async def decrypt(self, ciphertext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
+
+        size = memoryview(ciphertext).nbytes
+        return await self._run(size, self._cipher.decrypt, ciphertext, finalize)
+
+    async def finalize(self) -> bytes:
+        return await self._run(0, self._cipher.finalize)
+
+    def set_param(self, index: int, value: bytes) -> None:
+        self._cipher.set_param(index, value)
+
+    def get_param(self, index: int) -> bytes:
+        return self._cipher.get_param(index)
+
+    def reset(self, auto_renew_params: bool = True) -> None:
+        self._cipher.reset(auto_renew_params)
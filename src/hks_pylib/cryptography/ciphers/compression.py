@@ -0,0 +1,193 @@
+import lzma
+import zlib
+
+from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+
+from hks_pylib.hksenum import HKSEnum
+from hks_pylib.utils import BytesLike, is_bytes_like
+
+from hks_pylib.cryptography.ciphers.cipherid import CipherID
+from hks_pylib.cryptography.ciphers import HKSCipher, CipherProcess
+
+from hks_pylib.errors.cryptography import ResetError
+from hks_pylib.errors.cryptography.ciphers import CipherError
+from hks_pylib.errors.cryptography.ciphers.compression import CompressionError
+
+
+class Compression(HKSEnum):
+    ZLIB = "zlib"
+    LZMA = "lzma"
+
+
+# The default maximum size of the decompressed plaintext of a process.
+DEFAULT_MAX_SIZE = 1 << 30
+
+
+@CipherID.register
+class CompressingCipher(HKSCipher):
+    """Compress the plaintext before encrypting it by the inner cipher,
+    and decompress it after decrypting: ciphertext = E(compress(plaintext)).\n
+    The level is in [0, 9] for both algorithms (None for the default level).\n
+    The decryption raises CompressionError as soon as the decompressed
+    plaintext of a process exceeds max_size bytes (None for no limit), so
+    a small ciphertext cannot expand into an unbounded output."""
+    def __init__(self,
+                cipher_obj: HKSCipher,
+                algorithm: Compression = Compression.ZLIB,
+                level: int = None,
+                max_size: int = DEFAULT_MAX_SIZE
+            ) -> None:
+        if not isinstance(cipher_obj, HKSCipher):
+            raise HTypeError("cipher_obj", cipher_obj, HKSCipher)
+
+        if not isinstance(algorithm, Compression):
+            raise HTypeError("algorithm", algorithm, Compression)
+
+        if level is not None and not isinstance(level, int):
+            raise HTypeError("level", level, int, None)
+
+        if level is not None and not 0 <= level <= 9:
+            raise HFormatError("Parameter level expected an integer in [0, 9].")
+
+        if max_size is not None and not isinstance(max_size, int):
+            raise HTypeError("max_size", max_size, int, None)
+
+        if max_size is not None and max_size <= 0:
+            raise HFormatError("Parameter max_size expected a positive integer.")
+
+        super().__init__(None, cipher_obj._number_of_params)
+        self._cipher = cipher_obj
+        self._algorithm = algorithm
+        self._level = level
+        self._max_size = max_size
+
+        self._in_process = CipherProcess.NONE
+        self._compressor = None
+        self._decompressor = None
+
+        # The number of decompressed bytes in the current process.
+        self._decompressed_size = 0
+
+    def _new_compressor(self):
+        if self._algorithm is Compression.ZLIB:
+            return zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if self._level is None else self._level)
+        else:
+            return lzma.LZMACompressor(preset=self._level)
+
+    def _new_decompressor(self):
+        if self._algorithm is Compression.ZLIB:
+            return zlib.decompressobj()
+        else:
+            return lzma.LZMADecompressor()
+
+    def encrypt(self, plaintext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
+
+        if self._in_process is CipherProcess.NONE:
+            self._in_process = CipherProcess.ENCRYPT
+            self._compressor = self._new_compressor()
+
+        if self._in_process is not CipherProcess.ENCRYPT:
+            raise ResetError("You are in {} process, please call reset() "
+            "before calling encrypt().".format(self._in_process.name))
+
+        ciphertext = self._cipher.encrypt(self._compressor.compress(plaintext), finalize=False)
+
+        if finalize:
+            ciphertext += self.finalize()
+
+        return ciphertext
+
+    def decrypt(self, ciphertext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
+
+        if self._in_process is CipherProcess.NONE:
+            self._in_process = CipherProcess.DECRYPT
+            self._decompressor = self._new_decompressor()
+            self._decompressed_size = 0
+
+        if self._in_process is not CipherProcess.DECRYPT:
+            raise ResetError("You are in {} process, please call reset() "
+            "before calling decrypt().".format(self._in_process.name))
+
+        plaintext = self._decompress(self._cipher.decrypt(ciphertext, finalize=False))
+
+        if finalize:
+            plaintext += self.finalize()
+
+        return plaintext
+
+    def _decompress(self, data: bytes) -> bytes:
+        if not data:
+            return b""
+
+        if self._decompressor.eof:
+            raise CompressionError("Unexpected data after the end of the compressed data.")
+
+        # Stop the decompression one byte after the limit.
+        max_length = -1
+        if self._max_size is not None:
+            max_length = self._max_size - self._decompressed_size + 1
+
+        try:
+            plaintext = self._decompressor.decompress(data, max_length)
+        except (zlib.error, lzma.LZMAError) as e:
+            raise CompressionError("Cannot decompress the data ({}).".format(e))
+
+        self._count(plaintext)
+        self._check_unused_data()
+        return plaintext
+
+    def _count(self, plaintext: bytes) -> None:
+        self._decompressed_size += len(plaintext)
+        if self._max_size is not None and self._decompressed_size > self._max_size:
+            raise CompressionError("The decompressed data is larger than "
+            "{} bytes.".format(self._max_size))
+
+    def _check_unused_data(self) -> None:
+        # The bytes after the end of the stream in the same chunk.
+        if self._decompressor.unused_data:
+            raise CompressionError("Unexpected data after the end of the compressed data.")
+
+    def finalize(self) -> bytes:
+        if self._in_process is CipherProcess.ENCRYPT:
+            finaltext = self._cipher.encrypt(self._compressor.flush(), finalize=True)
+            self._compressor = None
+
+        elif self._in_process is CipherProcess.DECRYPT:
+            finaltext = self._decompress(self._cipher.finalize())
+            if self._algorithm is Compression.ZLIB:
+                flushed = self._decompressor.flush()
+                self._count(flushed)
+                finaltext += flushed
+
+            self._check_unused_data()
+
+            if not self._decompressor.eof:
+                raise CompressionError("The compressed data is truncated.")
+
+            self._decompressor = None
+
+        elif self._in_process is CipherProcess.FINALIZED:
+            raise ResetError("Unknown process in your object "
+            "({}).".format(self._in_process.name))
+        else:
+            raise CipherError("Unknown process ({}).".format(self._in_process.name))
+
+        self._in_process = CipherProcess.FINALIZED
+        return finaltext
+
+    def set_param(self, index: int, param: bytes) -> None:
+        return self._cipher.set_param(index, param)
+
+    def get_param(self, index: int) -> bytes:
+        return self._cipher.get_param(index)
+
+    def reset(self, auto_renew_params: bool = True):
+        self._cipher.reset(auto_renew_params)
+        self._compressor = None
+        self._decompressor = None
+        self._in_process = CipherProcess.NONE
@@ -0,0 +1,266 @@
+import os
+from typing import Tuple
+
+from hkserror import HTypeError
+
+from hks_pylib.utils import BytesLike, is_bytes_like
+
+from hks_pylib.cryptography.ciphers.cipherid import CipherID
+from hks_pylib.cryptography.ciphers import HKSCipher, CipherProcess
+from hks_pylib.cryptography.ciphers.asymmetrics import RSAKey, RSACipher, X25519Key
+from hks_pylib.cryptography.ciphers.symmetrics import AES_CTR, AES_GCM, ChaCha20_Poly1305, AEADCipher
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric import x25519
+
+from hks_pylib.errors.cryptography import ResetError
+from hks_pylib.errors.cryptography.ciphers import KeyError
+from hks_pylib.errors.cryptography.ciphers import CipherParameterError
+from hks_pylib.errors.cryptography.ciphers import FinalizeCipherError
+from hks_pylib.errors.cryptography.ciphers.asymmetrics import AsymmetricError
+
+
+class EnvelopeCipher(HKSCipher):
+    """Abstract class: NEVER USE.\n
+    Encrypt the payload by a symmetric cipher with a one-time key and nonce,
+    which are carried by a header_size-byte header before the payload:
+    ciphertext = header || E(plaintext). Subclasses build the header by
+    _wrap() and recover the key and nonce by _unwrap()."""
+    PAYLOAD_CIPHERS = (AES_CTR, AES_GCM, ChaCha20_Poly1305)
+    PAYLOAD_KEY_SIZE = 32
+
+    def __init__(self, key, payload_cipher: type) -> None:
+        if payload_cipher not in self.PAYLOAD_CIPHERS:
+            raise CipherParameterError("Parameter payload_cipher expected one of {}.".format(
+                [cls.__name__ for cls in self.PAYLOAD_CIPHERS]))
+
+        super().__init__(key, number_of_params=0)
+        self._payload_cipher = payload_cipher
+
+        self._in_process: CipherProcess = CipherProcess.NONE
+        self._payload: HKSCipher = None
+
+        # The received bytes of the header in the decryption process.
+        self._header: bytes = None
+
+    @property
+    def header_size(self) -> int:
+        raise NotImplementedError()
+
+    @property
+    def nonce_size(self) -> int:
+        if issubclass(self._payload_cipher, AEADCipher):
+            return self._payload_cipher.NONCE_SIZE
+
+        return 16
+
+    def _wrap(self) -> Tuple[bytes, bytes, bytes]:
+        "Return the header, the payload key and the payload nonce."
+        raise NotImplementedError()
+
+    def _unwrap(self, header: bytes) -> Tuple[bytes, bytes]:
+        "Return the payload key and the payload nonce of the header."
+        raise NotImplementedError()
+
+    def _new_payload(self, key: bytes, nonce: bytes) -> HKSCipher:
+        payload = self._payload_cipher(key)
+        payload.set_param(0, nonce)
+        return payload
+
+    def encrypt(self, plaintext: BytesLike, finalize: bool = True) -> bytes:
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
+
+        header = b""
+        if self._in_process is CipherProcess.NONE:
+            self._in_process = CipherProcess.ENCRYPT
+            header, key, nonce = self._wrap()
+            self._payload = self._new_payload(key, nonce)
+
+        if self._in_process is not CipherProcess.ENCRYPT:
+            raise ResetError("You are in {} process, please call reset() "
+            "before calling encrypt().".format(self._in_process.name))
+
+        ciphertext = header + self._payload.encrypt(plaintext, finalize=False)
+
+        if finalize:
+            ciphertext += self.finalize()
+
+        return ciphertext
+
+    def decrypt(self, ciphertext: BytesLike, finalize: bool = True) -> bytes:
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
+
+        if self._in_process is CipherProcess.NONE:
+            self._in_process = CipherProcess.DECRYPT
+            self._header = b""
+
+        if self._in_process is not CipherProcess.DECRYPT:
+            raise ResetError("You are in {} process, please call reset() "
+            "before calling decrypt().".format(self._in_process.name))
+
+        view = memoryview(ciphertext).cast("B")
+        if self._payload is None:
+            missing = self.header_size - len(self._header)
+            self._header += bytes(view[:missing])
+            view = view[missing:]
+
+            if len(self._header) == self.header_size:
+                key, nonce = self._unwrap(self._header)
+                try:
+                    self._payload = self._new_payload(key, nonce)
+                except CipherParameterError:
+                    raise AsymmetricError("Cannot unwrap the payload key.")
+
+                self._header = None
+
+        plaintext = b""
+        if self._payload is not None and len(view) > 0:
+            plaintext = self._payload.decrypt(view, finalize=False)
+
+        if finalize:
+            plaintext += self.finalize()
+
+        return plaintext
+
+    def finalize(self) -> bytes:
+        if self._in_process is CipherProcess.ENCRYPT:
+            finaltext = self._payload.finalize()
+
+        elif self._in_process is CipherProcess.DECRYPT:
+            # The process is over even if the authentication fails.
+            self._in_process = CipherProcess.FINALIZED
+            if self._payload is None:
+                raise AsymmetricError("The ciphertext is too short (expected >= {} "
+                "bytes of the header).".format(self.header_size))
+
+            finaltext = self._payload.finalize()
+
+        elif self._in_process is CipherProcess.FINALIZED:
+            raise ResetError("Unknown process in your object "
+            "({}).".format(self._in_process.name))
+        else:
+            raise AsymmetricError("Unknown process ({}).".format(self._in_process.name))
+
+        self._in_process = CipherProcess.FINALIZED
+        return finaltext
+
+    def set_param(self, index: int, value: bytes) -> None:
+        raise CipherParameterError("{} has no parameter.".format(type(self).__name__))
+
+    def get_param(self, index: int) -> None:
+        raise CipherParameterError("{} has no parameter.".format(type(self).__name__))
+
+    def reset(self, auto_renew_params: bool = True) -> None:
+        if self._in_process not in (CipherProcess.NONE, CipherProcess.FINALIZED):
+            raise FinalizeCipherError("Please finalize() the process before calling reset().")
+
+        self._in_process = CipherProcess.NONE
+        self._payload = None
+        self._header = None
+
+
+@CipherID.register
+class RSAEnvelopeCipher(EnvelopeCipher):
+    """Encrypt the payload by a symmetric cipher (AES_CTR, AES_GCM or
+    ChaCha20_Poly1305) with a random key, which is wrapped by RSA-OAEP
+    once per process: ciphertext = RSA(key || nonce) || E(plaintext).\n
+    The encryption only needs the public key, the decryption needs the
+    private key. Use an AEAD payload cipher (the default) to detect
+    modified ciphertexts."""
+    def __init__(self,
+                key: RSAKey,
+                payload_cipher: type = AES_GCM,
+                hash_algorithm: hashes.HashAlgorithm = hashes.SHA256
+            ) -> None:
+        if not isinstance(key, RSAKey):
+            raise HTypeError("key", key, RSAKey)
+
+        super().__init__(key, payload_cipher)
+        self._key: RSAKey
+        self._rsa = RSACipher(key, hash_algorithm)
+
+    @property
+    def header_size(self) -> int:
+        return self._rsa._keysize
+
+    def _wrap(self) -> Tuple[bytes, bytes, bytes]:
+        key = os.urandom(self.PAYLOAD_KEY_SIZE)
+        nonce = os.urandom(self.nonce_size)
+        return self._rsa._raw_encrypt(key + nonce), key, nonce
+
+    def _unwrap(self, header: bytes) -> Tuple[bytes, bytes]:
+        try:
+            secret = self._rsa._raw_decrypt(header)
+        except ValueError:
+            raise AsymmetricError("Cannot unwrap the payload key.")
+
+        return secret[:self.PAYLOAD_KEY_SIZE], secret[self.PAYLOAD_KEY_SIZE:]
+
+
+@CipherID.register
+class X25519Cipher(EnvelopeCipher):
+    """ECIES with X25519: each process generates an ephemeral X25519 key,
+    the payload key and nonce are derived by HKDF-SHA256 from the shared
+    secret with the recipient key, and the payload is encrypted by AES_GCM
+    or ChaCha20_Poly1305: ciphertext = ephemeral public key || E(plaintext).\n
+    The encryption only needs the public key, the decryption needs the
+    private key."""
+    PAYLOAD_CIPHERS = (AES_GCM, ChaCha20_Poly1305)
+    INFO = b"hks_pylib X25519Cipher"
+
+    def __init__(self, key: X25519Key, payload_cipher: type = AES_GCM) -> None:
+        if not isinstance(key, X25519Key):
+            raise HTypeError("key", key, X25519Key)
+
+        super().__init__(key, payload_cipher)
+        self._key: X25519Key
+
+    @property
+    def header_size(self) -> int:
+        return 32
+
+    @staticmethod
+    def _raw_public_bytes(public_key: x25519.X25519PublicKey) -> bytes:
+        return public_key.public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw
+        )
+
+    def _derive(self, shared_key: bytes, ephemeral: bytes) -> Tuple[bytes, bytes]:
+        # Bind the derived key to both public keys.
+        recipient = self._raw_public_bytes(self._key.public_key())
+        secret = HKDF(
+            algorithm=hashes.SHA256(),
+            length=self.PAYLOAD_KEY_SIZE + self.nonce_size,
+            salt=None,
+            info=self.INFO + ephemeral + recipient,
+            backend=default_backend()
+        ).derive(shared_key)
+
+        return secret[:self.PAYLOAD_KEY_SIZE], secret[self.PAYLOAD_KEY_SIZE:]
+
+    def _wrap(self) -> Tuple[bytes, bytes, bytes]:
+        if self._key.public_key() is None:
+            raise KeyError("Please import a key before calling encrypt().")
+
+        ephemeral_key = x25519.X25519PrivateKey.generate()
+        ephemeral = self._raw_public_bytes(ephemeral_key.public_key())
+        key, nonce = self._derive(ephemeral_key.exchange(self._key.public_key()), ephemeral)
+        return ephemeral, key, nonce
+
+    def _unwrap(self, header: bytes) -> Tuple[bytes, bytes]:
+        if self._key.private_key() is None:
+            raise KeyError("Please import a private key before calling decrypt().")
+
+        try:
+            shared_key = self._key.private_key().exchange(
+                x25519.X25519PublicKey.from_public_bytes(header))
+        except ValueError:
+            raise AsymmetricError("Cannot unwrap the payload key.")
+
+        return self._derive(shared_key, header)
@@ -1,7 +1,14 @@
-from typing import Any
+from typing import Any, Iterable, List, Optional, Tuple, Union
 
+from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
 
 from hks_pylib.hksenum import HKSEnum
+from hks_pylib.utils import BytesLike
+from hks_pylib.errors.cryptography.ciphers import BufferIsTooSmallError
+
+
+WritableBuffer = Union[bytearray, memoryview]
 
 
 class CipherProcess(HKSEnum):
@@ -16,15 +23,29 @@ class HKSCipher(object):
         self._key = key
         self._number_of_params = number_of_params
 
-    def encrypt(self, plaintext: bytes, finalize=True) -> bytes:
+    def encrypt(self, plaintext: BytesLike, finalize=True) -> bytes:
         raise NotImplementedError()
 
-    def decrypt(self, plaintext: bytes, finalize=True) -> bytes:
+    def decrypt(self, ciphertext: BytesLike, finalize=True) -> bytes:
         raise NotImplementedError()
 
     def finalize(self) -> bytes:
         raise NotImplementedError()
 
+    def encrypt_into(self, plaintext: BytesLike, buffer: WritableBuffer, finalize=True) -> int:
+        """Encrypt the plaintext and write the ciphertext into the buffer.
+        Return the number of written bytes.\n
+        Subclasses may override this method to avoid the intermediate copy."""
+        view = HKSCipher._writable_view(buffer)
+        return HKSCipher._write_into(self.encrypt(plaintext, finalize), view)
+
+    def decrypt_into(self, ciphertext: BytesLike, buffer: WritableBuffer, finalize=True) -> int:
+        """Decrypt the ciphertext and write the plaintext into the buffer.
+        Return the number of written bytes.\n
+        Subclasses may override this method to avoid the intermediate copy."""
+        view = HKSCipher._writable_view(buffer)
+        return HKSCipher._write_into(self.decrypt(ciphertext, finalize), view)
+
     def set_param(self, index: int, value: bytes) -> None:
         raise NotImplementedError()
 
@@ -33,3 +54,51 @@ class HKSCipher(object):
 
     def reset(self, auto_renew_params: bool = True) -> None:
         raise NotImplementedError()
+
+    def encrypt_many(self, messages: Iterable[BytesLike]) -> List[Tuple[Optional[bytes], bytes]]:
+        """Encrypt each message with fresh parameters. Return a list of
+        (param, ciphertext) pairs, where param is the first parameter
+        (IV/nonce) of the cipher or None if the cipher has no parameter.\n
+        Subclasses may override this method to amortize the cost of reset()."""
+        result = []
+        for message in messages:
+            self.reset()
+            ciphertext = self.encrypt(message)
+            param = self.get_param(0) if self._number_of_params else None
+            result.append((param, ciphertext))
+
+        return result
+
+    def decrypt_many(self, pairs: Iterable[Tuple[Optional[bytes], BytesLike]]) -> List[bytes]:
+        "Decrypt the (param, ciphertext) pairs returned by encrypt_many()."
+        result = []
+        for param, ciphertext in pairs:
+            if param is not None:
+                self.set_param(0, param)
+            self.reset(False)
+            result.append(self.decrypt(ciphertext))
+
+        return result
+
+    @staticmethod
+    def _writable_view(buffer: WritableBuffer) -> memoryview:
+        if not isinstance(buffer, (bytearray, memoryview)):
+            raise HTypeError("buffer", buffer, bytearray, memoryview)
+
+        view = memoryview(buffer)
+        if view.readonly:
+            raise HFormatError("Parameter buffer expected a writable buffer.")
+
+        if view.format != "B" or view.ndim != 1:
+            view = view.cast("B")
+
+        return view
+
+    @staticmethod
+    def _write_into(data: bytes, view: memoryview) -> int:
+        if len(data) > len(view):
+            raise BufferIsTooSmallError("The buffer is too small (expected >= {} "
+            "bytes, but got {} bytes).".format(len(data), len(view)))
+
+        view[:len(data)] = data
+        return len(data)
@@ -1,28 +1,193 @@
-from typing import Union
+import os
+import hmac
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple, Union
+
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 
 from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+from hks_pylib.hksenum import HKSEnum
+from hks_pylib.cryptography.kdf import Label, derive_keys
+
+
+class KDF(HKSEnum):
+    HKDF = "hkdf"
+    PBKDF2 = "pbkdf2"
+    SCRYPT = "scrypt"
+
+
+class _DerivedKeyCache(object):
+    """A thread-safe LRU cache of derived keys, whose entries expire after
+    ttl seconds (never if ttl is None). The expired entries are evicted
+    lazily, by each call of get(), put() and len(), not by a timer."""
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now: float) -> None:
+        # The caller MUST hold the lock. The LRU order is not the expiry
+        # order (get() moves the entries to the end), so scan all entries.
+        expired = [cache_key for cache_key, (expiry, _) in self._keys.items()
+            if expiry is not None and expiry <= now]
+
+        for cache_key in expired:
+            del self._keys[cache_key]
+
+    def get(self, cache_key: tuple) -> bytes:
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            entry = self._keys.get(cache_key)
+            if entry is None:
+                return None
+
+            self._keys.move_to_end(cache_key)
+            return entry[1]
+
+    def put(self, cache_key: tuple, key: bytes) -> None:
+        with self._lock:
+            now = time.monotonic()
+            expiry = None if self._ttl is None else now + self._ttl
+            self._keys[cache_key] = (expiry, key)
+            self._keys.move_to_end(cache_key)
+            self._evict_expired(now)
+            while len(self._keys) > self._max_size:
+                self._keys.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            return len(self._keys)
 
 
 class KeyGenerator(object):
-    def __init__(self, keysize, algorithm = None) -> None:
+    """Derive keys from a material (e.g. a password) by HKDF, PBKDF2 or
+    scrypt. PBKDF2 (iterations) and scrypt (n, r, p) are the choices for
+    passwords, they require a salt, which should be unique per user or
+    session.\n
+    If cache_size > 0, the derived keys are cached (LRU) by the keyed MAC of
+    the material, by the salt and the KDF parameters, so deriving the same key
+    again skips the KDF. The cached keys are dropped after ttl seconds, at
+    the next use of the cache (clear_cache() drops them at once)."""
+    def __init__(self,
+                keysize,
+                algorithm = None,
+                kdf: KDF = KDF.HKDF,
+                iterations: int = 100000,
+                n: int = 2 ** 14,
+                r: int = 8,
+                p: int = 1,
+                cache_size: int = 0,
+                ttl: float = None
+            ) -> None:
+        if not isinstance(kdf, KDF):
+            raise HTypeError("kdf", kdf, KDF)
+
+        for name, value in (("iterations", iterations), ("n", n), ("r", r), ("p", p), ("cache_size", cache_size)):
+            if not isinstance(value, int):
+                raise HTypeError(name, value, int)
+
+        if ttl is not None and not isinstance(ttl, (int, float)):
+            raise HTypeError("ttl", ttl, float, None)
+
+        if cache_size < 0 or (ttl is not None and ttl <= 0):
+            raise HFormatError("Expected cache_size >= 0 and ttl > 0.")
+
         self._keysize = keysize
 
         self._alogrithm = hashes.SHA256()
         if algorithm:
             self._alogrithm = algorithm
 
-    def pwd2key(self, material: Union[str, bytes]):
+        self._kdf = kdf
+        self._iterations = iterations
+        self._n, self._r, self._p = n, r, p
+
+        self._cache = _DerivedKeyCache(cache_size, ttl) if cache_size > 0 else None
+
+        # The materials are not kept in the cache, they are identified by a
+        # MAC with a random secret, which cannot be brute-forced offline.
+        self._cache_secret = os.urandom(32)
+
+    def _params(self) -> tuple:
+        if self._kdf is KDF.PBKDF2:
+            return (self._kdf.value, self._alogrithm.name, self._iterations)
+        elif self._kdf is KDF.SCRYPT:
+            return (self._kdf.value, self._n, self._r, self._p)
+        else:
+            return (self._kdf.value, self._alogrithm.name)
+
+    def _derive(self, material: bytes, salt: bytes, length: int, info: bytes) -> bytes:
+        if self._kdf is KDF.PBKDF2:
+            kdf = PBKDF2HMAC(self._alogrithm, length, salt, self._iterations, default_backend())
+        elif self._kdf is KDF.SCRYPT:
+            kdf = Scrypt(salt, length, self._n, self._r, self._p, default_backend())
+        else:
+            kdf = HKDF(algorithm=self._alogrithm, length=length, salt=salt, info=info)
+
+        return kdf.derive(material)
+
+    def _cached_derive(self, material: bytes, salt: bytes, length: int, info: bytes) -> bytes:
+        if self._cache is None:
+            return self._derive(material, salt, length, info)
+
+        fingerprint = hmac.new(self._cache_secret, material, hashlib.sha256).digest()
+        cache_key = (fingerprint, salt, length, info) + self._params()
+        key = self._cache.get(cache_key)
+        if key is None:
+            key = self._derive(material, salt, length, info)
+            self._cache.put(cache_key, key)
+
+        return key
+
+    def _check_material(self, material: Union[str, bytes], salt: bytes) -> bytes:
         if not isinstance(material, (str, bytes)):
             raise HTypeError("material", material, str, bytes)
 
+        if self._kdf is KDF.HKDF:
+            if salt is not None and not isinstance(salt, bytes):
+                raise HTypeError("salt", salt, bytes, None)
+        elif not isinstance(salt, bytes):
+            # A password KDF without salt allows the precomputed attacks.
+            raise HTypeError("salt", salt, bytes)
+
         if isinstance(material, str):
             material = material.encode()
 
-        return HKDF(
-            algorithm=self._alogrithm,
-            length=self._keysize,
-            salt=None,
-            info=b'handshake data',
-        ).derive(material)
+        return material
+
+    def pwd2key(self, material: Union[str, bytes], salt: bytes = None):
+        material = self._check_material(material, salt)
+        return self._cached_derive(material, salt, self._keysize, b'handshake data')
+
+    def pwd2keys(self,
+                material: Union[str, bytes],
+                labels: Iterable[Tuple[Label, int]],
+                salt: bytes = None
+            ) -> Dict[Label, bytes]:
+        """Derive many labeled keys from the material with one HKDF extract
+        step. With PBKDF2 or scrypt, the material is stretched once, then
+        the labeled keys are expanded from the stretched key."""
+        material = self._check_material(material, salt)
+        if self._kdf is KDF.HKDF:
+            return derive_keys(material, labels, salt, self._alogrithm)
+
+        master_key = self._cached_derive(material, salt, self._alogrithm.digest_size, None)
+        return derive_keys(master_key, labels, algorithm=self._alogrithm)
+
+    def clear_cache(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
@@ -0,0 +1,197 @@
+import asyncio
+import functools
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, Set
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+
+from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+
+from hks_pylib.cryptography.ciphers.asymmetrics import RSAKey, Encoding
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from hks_pylib.errors.cryptography.ciphers.keypool import KeyPoolError
+
+
+def _generate_private_key(keysize: int, e: int, encoding: Encoding) -> bytes:
+    # Run in a worker process, the key is returned as serialized bytes
+    # because the key objects cannot be pickled.
+    private_key = rsa.generate_private_key(
+        public_exponent=e,
+        key_size=keysize,
+        backend=default_backend()
+    )
+
+    return private_key.private_bytes(
+        encoding=encoding.value,
+        format=serialization.PrivateFormat.TraditionalOpenSSL,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+
+class RSAKeyPool(object):
+    """Keep capacity pre-generated RSAKeys of each key size ready. The keys
+    are generated in the background by the executor (a ProcessPoolExecutor
+    with workers processes if it is None) and refilled after each take().\n
+    The pool should be closed by close() (or a with statement)."""
+    def __init__(self,
+                keysizes: Iterable[int] = (2048,),
+                capacity: int = 4,
+                e: int = 65537,
+                encoding: Encoding = Encoding.PEM,
+                workers: int = None,
+                executor: Executor = None
+            ) -> None:
+        keysizes = tuple(keysizes)
+        if not all(isinstance(keysize, int) for keysize in keysizes):
+            raise HTypeError("keysizes", keysizes, "an iterable of int")
+
+        if not isinstance(capacity, int):
+            raise HTypeError("capacity", capacity, int)
+
+        if not isinstance(e, int):
+            raise HTypeError("e", e, int)
+
+        if not isinstance(encoding, Encoding):
+            raise HTypeError("encoding", encoding, Encoding)
+
+        if workers is not None and not isinstance(workers, int):
+            raise HTypeError("workers", workers, int, None)
+
+        if executor is not None and not isinstance(executor, Executor):
+            raise HTypeError("executor", executor, Executor, None)
+
+        if not keysizes or min(keysizes) < 1024:
+            raise HFormatError("Expected larger rsa keys (>=1024 bits).")
+
+        if capacity <= 0:
+            raise HFormatError("Parameter capacity expected a positive integer.")
+
+        self._capacity = capacity
+        self._e = e
+        self._encoding = encoding
+
+        self._own_executor = executor is None
+        self._executor = executor or ProcessPoolExecutor(workers)
+
+        self._condition = threading.Condition()
+        self._keys: Dict[int, Deque[RSAKey]] = {keysize: deque() for keysize in keysizes}
+        self._pending: Dict[int, int] = {keysize: 0 for keysize in keysizes}
+        self._futures: Set[Future] = set()
+        # The last generation error of each key size, raised by take().
+        self._errors: Dict[int, BaseException] = {}
+        self._closed = False
+
+        with self._condition:
+            for keysize in self._keys:
+                self._refill(keysize)
+
+    def _refill(self, keysize: int) -> None:
+        # The caller MUST hold the condition.
+        while len(self._keys[keysize]) + self._pending[keysize] < self._capacity:
+            future = self._executor.submit(_generate_private_key, keysize, self._e, self._encoding)
+            self._pending[keysize] += 1
+            self._futures.add(future)
+            future.add_done_callback(functools.partial(self._on_generated, keysize))
+
+    def _on_generated(self, keysize: int, future: Future) -> None:
+        rsakey = None
+        error = None
+        try:
+            if not future.cancelled():
+                rsakey = RSAKey(self._encoding)
+                # Each key is loaded once, it is not worth a slot of the key cache.
+                rsakey.deserialize_private_key(future.result(), cache=False)
+        except BaseException as e:
+            rsakey, error = None, e
+        finally:
+            with self._condition:
+                self._futures.discard(future)
+                self._pending[keysize] -= 1
+                if rsakey is not None:
+                    self._keys[keysize].append(rsakey)
+                elif error is not None:
+                    self._errors[keysize] = error
+
+                self._condition.notify_all()
+
+    def _check_keysize(self, keysize: int) -> int:
+        if keysize is None:
+            return next(iter(self._keys))
+
+        if keysize not in self._keys:
+            raise HFormatError("The key size {} is not configured "
+            "(expected one of {}).".format(keysize, list(self._keys)))
+
+        return keysize
+
+    def available(self, keysize: int) -> int:
+        "Return the number of ready keys of keysize."
+        with self._condition:
+            return len(self._keys.get(keysize, ()))
+
+    def take(self, keysize: int = None, timeout: float = None) -> RSAKey:
+        """Return a ready key of keysize (the first configured size if it
+        is None), wait if there is no ready key. Raise KeyPoolError after
+        timeout seconds, if a key generation fails or the pool is closed."""
+        keysize = self._check_keysize(keysize)
+        with self._condition:
+            # Replace the keys whose generation failed before.
+            if not self._closed:
+                self._refill(keysize)
+
+            available = self._condition.wait_for(
+                lambda: self._keys[keysize] or keysize in self._errors or self._closed,
+                timeout
+            )
+
+            if self._closed:
+                raise KeyPoolError("The pool is closed.")
+
+            error = self._errors.pop(keysize, None)
+            if error is not None:
+                raise KeyPoolError("Cannot generate a key ({}).".format(error)) from error
+
+            if not available:
+                raise KeyPoolError("No key of {} bits is ready after "
+                "{} seconds.".format(keysize, timeout))
+
+            rsakey = self._keys[keysize].popleft()
+            self._refill(keysize)
+
+        return rsakey
+
+    async def take_async(self, keysize: int = None, timeout: float = None) -> RSAKey:
+        "Like take(), but wait in the default executor of the running event loop."
+        keysize = self._check_keysize(keysize)
+        with self._condition:
+            if self._keys[keysize] and not self._closed:
+                rsakey = self._keys[keysize].popleft()
+                self._refill(keysize)
+                return rsakey
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.take, keysize, timeout))
+
+    def close(self) -> None:
+        "Stop generating keys. The executor is shut down if the pool owns it."
+        with self._condition:
+            self._closed = True
+            futures = list(self._futures)
+            self._condition.notify_all()
+
+        for future in futures:
+            future.cancel()
+
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+
+    def __enter__(self) -> "RSAKeyPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
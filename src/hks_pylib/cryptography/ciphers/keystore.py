@@ -0,0 +1,157 @@
+"""
+A file-backed store of many named RSA keys.\n
+Layout (all integers are big-endian):
+- Header: `MAGIC | version (1 byte)`.
+- Records: `name length (2 bytes) | public key length (4 bytes) | private
+key length (4 bytes) | name (utf-8) | public key (DER) | private key (DER,
+encrypted if a password is given, empty if there is no private key)`.
+
+Records are only appended, the last record of a name wins. The index
+(name -> record position) is built by reading the record headers when the
+store is opened. The deserialized keys are cached by RSAKey, so getting
+the same key again costs a dict lookup instead of parsing and a KDF.
+"""
+
+import os
+import struct
+import threading
+from typing import Dict, List, Tuple
+
+from hkserror import HTypeError
+
+from hks_pylib.cryptography.ciphers.asymmetrics import RSAKey, Encoding
+
+from hks_pylib.errors.cryptography.ciphers.keystore import KeyStoreError
+from hks_pylib.errors.cryptography.ciphers.keystore import KeyStoreFormatError, NotExistKeyError
+
+
+MAGIC = b"HKSK"
+VERSION = 1
+
+_HEADER = struct.Struct(">4sB")
+_RECORD_HEADER = struct.Struct(">HII")
+
+
+class RSAKeyStore(object):
+    "A file-backed store of named RSAKeys, see the module docstring for the layout."
+    def __init__(self, path: str) -> None:
+        if not isinstance(path, str):
+            raise HTypeError("path", path, str)
+
+        self._path = path
+        self._lock = threading.Lock()
+
+        # name -> (public key offset, public key size, private key size).
+        self._index: Dict[str, Tuple[int, int, int]] = {}
+
+        if not os.path.isfile(path):
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, VERSION))
+
+        self._load_index()
+
+    def _load_index(self) -> None:
+        with open(self._path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise KeyStoreFormatError("The keystore is too short.")
+
+            magic, version = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise KeyStoreFormatError("Invalid magic number of the keystore.")
+
+            if version != VERSION:
+                raise KeyStoreFormatError("Unsupported keystore version ({}).".format(version))
+
+            file_size = os.fstat(f.fileno()).st_size
+            while f.tell() < file_size:
+                record_header = f.read(_RECORD_HEADER.size)
+                if len(record_header) != _RECORD_HEADER.size:
+                    raise KeyStoreFormatError("The record header is truncated.")
+
+                name_size, public_size, private_size = _RECORD_HEADER.unpack(record_header)
+                try:
+                    name = f.read(name_size).decode()
+                except UnicodeDecodeError:
+                    raise KeyStoreFormatError("The name of a record is not valid utf-8.")
+
+                offset = f.tell()
+                if offset + public_size + private_size > file_size:
+                    raise KeyStoreFormatError("The record of {} is truncated.".format(name))
+
+                self._index[name] = (offset, public_size, private_size)
+                f.seek(public_size + private_size, os.SEEK_CUR)
+
+    def put(self, name: str, key: RSAKey, password: bytes = None) -> None:
+        """Store the key (its private key if any, encrypted by the password if
+        it is given) under the name, replacing the previous key of the name."""
+        if not isinstance(name, str):
+            raise HTypeError("name", name, str)
+
+        if not isinstance(key, RSAKey):
+            raise HTypeError("key", key, RSAKey)
+
+        if password is not None and not isinstance(password, bytes):
+            raise HTypeError("password", password, bytes, None)
+
+        if key.public_key() is None:
+            raise KeyStoreError("Please import a key before storing it.")
+
+        # Serialize by a DER copy of the key, whatever the encoding of the key is.
+        der_key = RSAKey(Encoding.DER)
+        private = b""
+        if key.private_key() is not None:
+            der_key._set_private_key(key.private_key())
+            private = der_key.serialize_private_key(password)
+        else:
+            der_key._set_public_key(key.public_key())
+
+        public = der_key.serialize_public_key()
+
+        encoded_name = name.encode()
+
+        with self._lock:
+            with open(self._path, "ab") as f:
+                f.write(_RECORD_HEADER.pack(len(encoded_name), len(public), len(private)))
+                f.write(encoded_name)
+                offset = f.tell()
+                f.write(public)
+                f.write(private)
+
+            self._index[name] = (offset, len(public), len(private))
+
+    def get(self, name: str, password: bytes = None) -> RSAKey:
+        """Return the key of the name. The returned RSAKey uses the DER
+        encoding, its private key is loaded if it was stored."""
+        if not isinstance(name, str):
+            raise HTypeError("name", name, str)
+
+        with self._lock:
+            if name not in self._index:
+                raise NotExistKeyError("The keystore has no key named {}.".format(name))
+
+            offset, public_size, private_size = self._index[name]
+            with open(self._path, "rb") as f:
+                f.seek(offset)
+                public = f.read(public_size)
+                private = f.read(private_size)
+
+        key = RSAKey(Encoding.DER)
+        if private:
+            key.deserialize_private_key(private, password)
+        else:
+            key.deserialize_public_key(public)
+
+        return key
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
@@ -0,0 +1,116 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+
+from hks_pylib.cryptography.ciphers import HKSCipher
+from hks_pylib.errors.cryptography.ciphers import CipherError
+
+
+class CipherPool(object):
+    """A thread-safe pool of pre-keyed ciphers created by the factory.\n
+    A cipher is checked out by acquire() (or the checkout() context manager)
+    and returned by release(), which resets it. The pool keeps at most
+    max_size idle ciphers, a new cipher is created if there is no idle one.
+    The thread_cipher() returns a cipher dedicated to the current thread."""
+    def __init__(self,
+                factory: Callable[[], HKSCipher],
+                max_size: int = 16,
+                initial_size: int = 0
+            ) -> None:
+        if not callable(factory):
+            raise HTypeError("factory", factory, Callable)
+
+        if not isinstance(max_size, int):
+            raise HTypeError("max_size", max_size, int)
+
+        if not isinstance(initial_size, int):
+            raise HTypeError("initial_size", initial_size, int)
+
+        if max_size <= 0 or not 0 <= initial_size <= max_size:
+            raise HFormatError("Expected 0 <= initial_size <= max_size and max_size > 0.")
+
+        self._factory = factory
+        self._max_size = max_size
+
+        self._lock = threading.Lock()
+        self._idle: List[HKSCipher] = [self._create() for _ in range(initial_size)]
+        self._local = threading.local()
+
+        self._hits = 0
+        self._misses = 0
+
+    def _create(self) -> HKSCipher:
+        cipher = self._factory()
+        if not isinstance(cipher, HKSCipher):
+            raise HTypeError("factory()", cipher, HKSCipher)
+
+        cipher.reset()
+        return cipher
+
+    def acquire(self) -> HKSCipher:
+        "Check out a cipher, which is ready for a new process."
+        with self._lock:
+            if self._idle:
+                self._hits += 1
+                return self._idle.pop()
+
+            self._misses += 1
+
+        return self._create()
+
+    def release(self, cipher: HKSCipher) -> None:
+        """Reset the cipher and return it to the pool. The cipher is dropped
+        if it cannot be reset (e.g. its process has not been finalized) or
+        the pool is full."""
+        if not isinstance(cipher, HKSCipher):
+            raise HTypeError("cipher", cipher, HKSCipher)
+
+        try:
+            cipher.reset()
+        except CipherError:
+            return
+
+        with self._lock:
+            if len(self._idle) < self._max_size:
+                self._idle.append(cipher)
+
+    @contextmanager
+    def checkout(self) -> Iterator[HKSCipher]:
+        cipher = self.acquire()
+        try:
+            yield cipher
+        finally:
+            self.release(cipher)
+
+    def thread_cipher(self) -> HKSCipher:
+        """Return the cipher of the current thread. It is never shared with
+        other threads and never returned to the pool, the caller must
+        reset() it before each process."""
+        cipher = getattr(self._local, "cipher", None)
+        if cipher is None:
+            cipher = self.acquire()
+            self._local.cipher = cipher
+
+        return cipher
+
+    @property
+    def idle_size(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        with self._lock:
+            total = self._hits + self._misses
+            return self._hits / total if total else 0.0
@@ -0,0 +1,168 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Tuple, Union
+
+from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+
+from hks_pylib.hksenum import HKSEnum
+from hks_pylib.math import ceil_div
+from hks_pylib.utils import BytesLike, is_bytes_like
+from hks_pylib.cryptography.ciphers.asymmetrics import AsymmetricKey, RSAKey
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding
+
+from hks_pylib.errors.cryptography.ciphers.asymmetrics import NotExistPrivateKeyError
+from hks_pylib.errors.cryptography.ciphers.asymmetrics import NotExistPublicKeyError
+
+
+class Curve(HKSEnum):
+    SECP256R1 = ec.SECP256R1
+    SECP384R1 = ec.SECP384R1
+    SECP521R1 = ec.SECP521R1
+
+
+class Ed25519Key(AsymmetricKey):
+    PRIVATE_KEY_TYPE = ed25519.Ed25519PrivateKey
+    PUBLIC_KEY_TYPE = ed25519.Ed25519PublicKey
+
+    def generate(self):
+        self._set_private_key(ed25519.Ed25519PrivateKey.generate())
+
+    def private_key(self) -> ed25519.Ed25519PrivateKey:
+        return super().private_key()
+
+    def public_key(self) -> ed25519.Ed25519PublicKey:
+        return super().public_key()
+
+    def key_size(self):
+        return 256
+
+
+class ECDSAKey(AsymmetricKey):
+    "An elliptic curve key, the messages are hashed by SHA256, SHA384 or SHA512 by the curve size."
+    PRIVATE_KEY_TYPE = ec.EllipticCurvePrivateKey
+    PUBLIC_KEY_TYPE = ec.EllipticCurvePublicKey
+
+    def generate(self, curve: Curve = Curve.SECP256R1):
+        if not isinstance(curve, Curve):
+            raise HTypeError("curve", curve, Curve)
+
+        self._set_private_key(ec.generate_private_key(curve.value(), default_backend()))
+
+    def private_key(self) -> ec.EllipticCurvePrivateKeyWithSerialization:
+        return super().private_key()
+
+    def public_key(self) -> ec.EllipticCurvePublicKeyWithSerialization:
+        return super().public_key()
+
+    def key_size(self):
+        key = self.private_key() or self.public_key()
+        if key is None:
+            raise NotExistPublicKeyError("Please import (generate/load/deserialize) "
+            "a key before getting key_size.")
+
+        return key.curve.key_size
+
+    def signature_algorithm(self) -> ec.ECDSA:
+        key_size = self.key_size()
+        if key_size <= 256:
+            return _ECDSA_SHA256
+        elif key_size <= 384:
+            return _ECDSA_SHA384
+        else:
+            return _ECDSA_SHA512
+
+
+SignatureKey = Union[Ed25519Key, ECDSAKey, RSAKey]
+
+# The padding and algorithm objects are immutable, they are shared by all calls.
+_PSS = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+_PSS_HASH = hashes.SHA256()
+_ECDSA_SHA256 = ec.ECDSA(hashes.SHA256())
+_ECDSA_SHA384 = ec.ECDSA(hashes.SHA384())
+_ECDSA_SHA512 = ec.ECDSA(hashes.SHA512())
+
+
+def _check_key(key: SignatureKey) -> None:
+    if not isinstance(key, (Ed25519Key, ECDSAKey, RSAKey)):
+        raise HTypeError("key", key, Ed25519Key, ECDSAKey, RSAKey)
+
+
+def sign(key: SignatureKey, message: BytesLike) -> bytes:
+    """Sign the message by the private key: Ed25519, ECDSA (see ECDSAKey)
+    or RSA-PSS with SHA256."""
+    _check_key(key)
+    if not is_bytes_like(message):
+        raise HTypeError("message", message, "bytes-like object")
+
+    if key.private_key() is None:
+        raise NotExistPrivateKeyError("Please import a private key before calling sign().")
+
+    message = bytes(message)
+    if isinstance(key, Ed25519Key):
+        return key.private_key().sign(message)
+    elif isinstance(key, ECDSAKey):
+        return key.private_key().sign(message, key.signature_algorithm())
+    else:
+        return key.private_key().sign(message, _PSS, _PSS_HASH)
+
+
+def verify(key: SignatureKey, message: BytesLike, signature: bytes) -> bool:
+    "Return True if the signature of the message is valid for the public key."
+    _check_key(key)
+    if not is_bytes_like(message):
+        raise HTypeError("message", message, "bytes-like object")
+
+    if not isinstance(signature, bytes):
+        raise HTypeError("signature", signature, bytes)
+
+    if key.public_key() is None:
+        raise NotExistPublicKeyError("Please import a public key before calling verify().")
+
+    message = bytes(message)
+    try:
+        if isinstance(key, Ed25519Key):
+            key.public_key().verify(signature, message)
+        elif isinstance(key, ECDSAKey):
+            key.public_key().verify(signature, message, key.signature_algorithm())
+        else:
+            key.public_key().verify(signature, message, _PSS, _PSS_HASH)
+    except InvalidSignature:
+        return False
+
+    return True
+
+
+def verify_many(
+            items: Iterable[Tuple[BytesLike, bytes, SignatureKey]],
+            workers: int = 1
+        ) -> List[bool]:
+    """Verify a batch of (message, signature, key) tuples, return the results
+    in the same order. If workers > 1, the batch is split into workers
+    slices, which are verified on a thread pool (OpenSSL releases the GIL)."""
+    if not isinstance(workers, int):
+        raise HTypeError("workers", workers, int)
+
+    if workers < 1:
+        raise HFormatError("Parameter workers expected a positive integer.")
+
+    items = list(items)
+    workers = max(1, min(workers, len(items)))
+    slice_size = ceil_div(len(items), workers)
+
+    def verify_slice(start: int) -> List[bool]:
+        return [verify(key, message, signature)
+            for message, signature, key in items[start : start + slice_size]]
+
+    if workers == 1:
+        return verify_slice(0)
+
+    with ThreadPoolExecutor(workers) as executor:
+        results = []
+        for result in executor.map(verify_slice, range(0, len(items), slice_size)):
+            results.extend(result)
+
+    return results
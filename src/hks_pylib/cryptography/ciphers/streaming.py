@@ -0,0 +1,122 @@
+from typing import Callable, Iterable, Iterator, Union
+
+from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+
+from hks_pylib.utils import BytesLike, is_bytes_like
+from hks_pylib.files.generator import BytesGenerator
+from hks_pylib.cryptography.ciphers import HKSCipher
+
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+Source = Union[BytesGenerator, Iterable[BytesLike]]
+Sink = Callable[[bytes], object]
+
+
+def _iter_source(source: Source, buffer_size: int) -> Iterator[BytesLike]:
+    if isinstance(source, BytesGenerator):
+        yield from source.iter(buffer_size)
+        return
+
+    # Split the large buffers, so that at most buffer_size bytes
+    # are passed to the cipher at once.
+    for data in source:
+        if not is_bytes_like(data):
+            raise HTypeError("source", data, "an iterable of bytes-like objects")
+
+        view = memoryview(data).cast("B")
+        for start in range(0, len(view), buffer_size):
+            yield view[start : start + buffer_size]
+
+
+def _process_stream(
+            process: Callable[[BytesLike, bool], bytes],
+            cipher: HKSCipher,
+            source: Source,
+            buffer_size: int
+        ) -> Iterator[bytes]:
+    fed = False
+    for data in _iter_source(source, buffer_size):
+        fed = True
+        output = process(data, finalize=False)
+        if output:
+            yield output
+
+    # An empty source must still start the process before finalize(),
+    # e.g. to emit the header of an envelope or the tag of an AEAD.
+    if not fed:
+        output = process(b"", finalize=False)
+        if output:
+            yield output
+
+    output = cipher.finalize()
+    if output:
+        yield output
+
+
+def _check_stream_params(cipher: HKSCipher, source: Source, buffer_size: int, sink: Sink):
+    if not isinstance(cipher, HKSCipher):
+        raise HTypeError("cipher", cipher, HKSCipher)
+
+    if not isinstance(source, BytesGenerator) and not hasattr(source, "__iter__"):
+        raise HTypeError("source", source, BytesGenerator, Iterable)
+
+    if not isinstance(buffer_size, int):
+        raise HTypeError("buffer_size", buffer_size, int)
+
+    if buffer_size <= 0:
+        raise HFormatError("Parameter buffer_size expected a positive integer.")
+
+    if sink is not None and not callable(sink):
+        raise HTypeError("sink", sink, Callable, None)
+
+
+def _drain(chunks: Iterator[bytes], sink: Sink) -> int:
+    nbytes = 0
+    for chunk in chunks:
+        sink(chunk)
+        nbytes += len(chunk)
+
+    return nbytes
+
+
+def encrypt_stream(
+            cipher: HKSCipher,
+            source: Source,
+            buffer_size: int = DEFAULT_BUFFER_SIZE,
+            sink: Sink = None
+        ) -> Union[Iterator[bytes], int]:
+    """Encrypt a BytesGenerator (or any iterable of bytes-like objects) chunk
+    by chunk, at most buffer_size bytes are passed to the cipher at once.
+    The cipher MUST be ready for a new process (e.g. after reset()), it is
+    finalized at the end of the stream.\n
+    Return a generator of ciphertext chunks. If sink is given, every chunk
+    is passed to sink instead, and the number of ciphertext bytes is
+    returned."""
+    _check_stream_params(cipher, source, buffer_size, sink)
+
+    chunks = _process_stream(cipher.encrypt, cipher, source, buffer_size)
+    if sink is None:
+        return chunks
+
+    return _drain(chunks, sink)
+
+
+def decrypt_stream(
+            cipher: HKSCipher,
+            source: Source,
+            buffer_size: int = DEFAULT_BUFFER_SIZE,
+            sink: Sink = None
+        ) -> Union[Iterator[bytes], int]:
+    """Decrypt a BytesGenerator (or any iterable of bytes-like objects) chunk
+    by chunk, see encrypt_stream(). For authenticated ciphers (HybridCipher,
+    AES_GCM, ...), the plaintext chunks MUST NOT be trusted until the
+    generator is exhausted (or the sink call returns) without errors."""
+    _check_stream_params(cipher, source, buffer_size, sink)
+
+    chunks = _process_stream(cipher.decrypt, cipher, source, buffer_size)
+    if sink is None:
+        return chunks
+
+    return _drain(chunks, sink)
@@ -1,33 +1,77 @@
 import os
+import struct
+from typing import Iterable, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 from hkserror.hkserror import HTypeError
 from hks_pylib.errors.cryptography.ciphers import KeyError
 
-from hks_pylib.math import bxor
+from hks_pylib.math import bxor, ceil_div
+from hks_pylib.utils import BytesLike, is_bytes_like
 
 from hks_pylib.cryptography.hashes import SHA256, HKSHash
 from hks_pylib.cryptography.ciphers.cipherid import CipherID
 from hks_pylib.cryptography.ciphers import HKSCipher, CipherProcess
+from hks_pylib.cryptography.ciphers.hkscipher import WritableBuffer
 
-from cryptography.hazmat.primitives import padding
+from cryptography.exceptions import InvalidSignature, InvalidTag
+from cryptography.hazmat.primitives import padding, poly1305
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.ciphers import Cipher, CipherContext, algorithms, modes
 
 from hks_pylib.errors.cryptography import ResetError
 from hks_pylib.errors.cryptography.ciphers import CipherParameterError
 from hks_pylib.errors.cryptography.ciphers import FinalizeCipherError
+from hks_pylib.errors.cryptography.ciphers import BufferIsTooSmallError
 from hks_pylib.errors.cryptography.ciphers import CipherParameterError
 from hks_pylib.errors.cryptography.ciphers.symmetrics import SymmetricError, UnAuthenticatedPacketError
 
 
+def _update_into(context: CipherContext, data: BytesLike, view: memoryview) -> int:
+    # CipherContext.update_into() requires block_size - 1 bytes of
+    # slack in the buffer, fall back to update() if there is no room.
+    if len(view) >= len(data) + algorithms.AES.block_size // 8 - 1:
+        return context.update_into(data, view)
+
+    return HKSCipher._write_into(context.update(data), view)
+
+
+def _check_messages(messages: Iterable[BytesLike]) -> List[BytesLike]:
+    messages = list(messages)
+    for message in messages:
+        if not is_bytes_like(message):
+            raise HTypeError("messages", message, "an iterable of bytes-like objects")
+
+    return messages
+
+
+def _check_pairs(pairs: Iterable[Tuple[bytes, BytesLike]]) -> List[Tuple[bytes, BytesLike]]:
+    pairs = list(pairs)
+    for param, ciphertext in pairs:
+        if not isinstance(param, bytes) or len(param) * 8 != algorithms.AES.block_size:
+            raise CipherParameterError("Parameters of AES must be "
+            "{}-bit bytes objects.".format(algorithms.AES.block_size))
+
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("pairs", ciphertext, "an iterable of (bytes, bytes-like object)")
+
+    return pairs
+
+
 @CipherID.register
 class NoCipher(HKSCipher):
     "Do not encrypt the message"
     def encrypt(self, plaintext, finalize=True):
-        return plaintext
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
+
+        return bytes(plaintext)
 
     def decrypt(self, ciphertext, finalize=True):
-        return ciphertext
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
+
+        return bytes(ciphertext)
     
     def finalize(self) -> bytes:
         return b""
@@ -46,25 +90,32 @@ class NoCipher(HKSCipher):
 @CipherID.register
 class XorCipher(HKSCipher):
     "Encrypt the payload using xor operator: c = p xor key"
+    # The number of bytes xor-ed in one big-integer operation.
+    SLAB_SIZE = 64 * 1024
+
     def __init__(self, key: bytes):
         if not isinstance(key, bytes) :
             raise HTypeError("key", key, bytes)
 
         super().__init__(key, 1)
         self._in_process: CipherProcess = CipherProcess.NONE
-        self._data: bytes = None
+        self._data: bytearray = None
         self._iv: bytes = None
 
-    def encrypt(self, plaintext: bytes, finalize=True) -> bytes:
-        if not isinstance(plaintext, bytes):
-            raise HTypeError("plaintext", plaintext, bytes)
+        # The (key xor iv) pattern repeated up to SLAB_SIZE bytes.
+        self._keystream: bytes = None
+        self._keystream_int: int = None
+
+    def encrypt(self, plaintext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
 
         if not self._key:
             raise KeyError("Please provide key before calling encrypt()")
 
         if self._in_process is CipherProcess.NONE:
             self._in_process = CipherProcess.ENCRYPT
-            self._data = b""
+            self._data = bytearray()
         
         if self._in_process is not CipherProcess.ENCRYPT:
             raise ResetError("You are in {} process, please call reset() "
@@ -74,27 +125,23 @@ class XorCipher(HKSCipher):
             raise CipherParameterError("IV has not been set yet.")
 
         self._data += plaintext
-        ciphertext = b""
-        while len(self._data) > len(self._key):
-            data_to_enc, self._data = self._data[:len(self._key)], self._data[len(self._key):]
-            block = bxor(data_to_enc, self._key)
-            ciphertext += bxor(block, self._iv)
+        ciphertext = self._xor_pending_blocks()
 
         if finalize:
             ciphertext += self.finalize()
 
         return ciphertext
 
-    def decrypt(self, ciphertext: bytes, finalize=True) -> bytes:
-        if not isinstance(ciphertext, bytes):
-            raise HTypeError("ciphertext", ciphertext, bytes)
+    def decrypt(self, ciphertext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
   
         if not self._key:
             raise KeyError("Please provide key before calling decrypt()")
 
         if self._in_process is CipherProcess.NONE:
             self._in_process = CipherProcess.DECRYPT
-            self._data = b""
+            self._data = bytearray()
         
         if self._in_process is not CipherProcess.DECRYPT:
             raise ResetError("You are in {} process, please call reset() "
@@ -104,20 +151,37 @@ class XorCipher(HKSCipher):
             raise CipherParameterError("IV has not yet been set.")
 
         self._data += ciphertext
-        plaintext = b""
-        while len(self._data) > len(self._key):
-            data_to_enc, self._data = self._data[:len(self._key)], self._data[len(self._key):]
-            block = bxor(data_to_enc, self._key)
-            plaintext += bxor(block, self._iv)
+        plaintext = self._xor_pending_blocks()
 
         if finalize:
             plaintext += self.finalize()
 
         return plaintext
 
+    def _xor_pending_blocks(self) -> bytes:
+        # The last block (maybe a full block) is always kept
+        # for finalize(), which xors it with the key only.
+        keysize = len(self._key)
+        size = (len(self._data) - 1) // keysize * keysize
+        if size <= 0:
+            return b""
+
+        output = bytearray(size)
+        view = memoryview(self._data)
+        slab_size = len(self._keystream)
+        for start in range(0, size, slab_size):
+            end = min(start + slab_size, size)
+            block = int.from_bytes(view[start:end], "big")
+            stream = self._keystream_int >> ((slab_size - end + start) * 8)
+            output[start:end] = (block ^ stream).to_bytes(end - start, "big")
+        view.release()
+
+        del self._data[:size]
+        return bytes(output)
+
     def finalize(self) -> bytes:
         ld = len(self._data)
-        finaltext = bxor(self._data, self._key[:ld])
+        finaltext = bxor(bytes(self._data), self._key[:ld])
 
         self._data = CipherProcess.FINALIZED
         return finaltext
@@ -132,6 +196,9 @@ class XorCipher(HKSCipher):
                 "which is the same size as the key.")
             else:
                 self._iv = value
+                pattern = bxor(self._key, self._iv)
+                self._keystream = pattern * max(1, XorCipher.SLAB_SIZE // max(1, len(pattern)))
+                self._keystream_int = int.from_bytes(self._keystream, "big")
         else:
             raise CipherParameterError("Index exceeds (XorCipher use only one parameter).")
 
@@ -153,10 +220,28 @@ class XorCipher(HKSCipher):
 
 @CipherID.register
 class AES_CTR(HKSCipher):
-    def __init__(self, key: bytes):
+    """AES in Counter Mode.\n
+    If workers > 1, an input which is larger than 2 * SEGMENT_SIZE bytes
+    is split into counter-aligned segments, which are encrypted on a
+    thread pool (OpenSSL releases the GIL). The output is the same as the
+    one of the serial mode."""
+    # The minimum number of bytes processed by one worker.
+    SEGMENT_SIZE = 1024 * 1024
+
+    # The maximum size of messages whose keystream is computed in
+    # one batch by encrypt_many() and decrypt_many().
+    BATCH_MESSAGE_SIZE = 512
+
+    def __init__(self, key: bytes, workers: int = 1):
         if not isinstance(key, bytes):
             raise HTypeError("key", key, bytes)
 
+        if not isinstance(workers, int):
+            raise HTypeError("workers", workers, int)
+
+        if workers < 1:
+            raise CipherParameterError("Parameter workers expected a positive integer.")
+
         if len(key) * 8 not in algorithms.AES.key_sizes:
             raise CipherParameterError("Key size of AES must be in {} (bits), "
             "not {} (bytes).".format(
@@ -165,65 +250,315 @@ class AES_CTR(HKSCipher):
             ))
 
         super().__init__(key, number_of_params=1)
+        # The key-bound algorithm is shared by all Cipher objects of this key.
+        self._algorithm = algorithms.AES(key)
         self._aes: Cipher = None
         self._encryptor: CipherContext = None
         self._decryptor: CipherContext = None
         self._in_process: CipherProcess = CipherProcess.NONE
         self._nonce = None
 
-    def encrypt(self, plaintext: bytes, finalize=True) -> bytes:
-        if not isinstance(plaintext, bytes):
-            raise HTypeError("plaintext", plaintext, bytes)
+        # The position in the stream of the next processed byte.
+        self._offset: int = 0
+        self._workers = workers
+
+        # The thread pool of the parallel mode, it is created by the first
+        # parallel call and shut down by finalize() and reset().
+        self._executor: ThreadPoolExecutor = None
 
+    def _get_context(self, process: CipherProcess, caller: str) -> CipherContext:
         if not self._key:
-            raise KeyError("Please provide key before calling encrypt()")
+            raise KeyError("Please provide key before calling {}()".format(caller))
 
         if self._aes is None:
             raise CipherParameterError("Please set nonce "
-            "value before calling encrypt().")
+            "value before calling {}().".format(caller))
 
         if self._in_process is CipherProcess.NONE:
-            self._in_process = CipherProcess.ENCRYPT
-            self._encryptor = self._aes.encryptor()
+            self._in_process = process
+            self._set_context(self._offset)
 
-        if self._in_process is not CipherProcess.ENCRYPT:
+        if self._in_process is not process:
             raise ResetError("You are in {} process, please call reset() "
-            "before calling encrypt().".format(self._in_process.name))
+            "before calling {}().".format(self._in_process.name, caller))
 
-        ciphertext = self._encryptor.update(plaintext)
+        if process is CipherProcess.ENCRYPT:
+            return self._encryptor
+        else:
+            return self._decryptor
 
-        if finalize:
-            ciphertext += self.finalize()
+    def _context_at(self, offset: int, process: CipherProcess) -> CipherContext:
+        # The counter block of the byte at offset is (nonce + offset // 16),
+        # then the first offset % 16 bytes of that keystream block are skipped.
+        block_size = algorithms.AES.block_size // 8
+        block_index, skip = divmod(offset, block_size)
 
-        return ciphertext
+        counter = int.from_bytes(self._nonce, "big") + block_index
+        counter %= 1 << algorithms.AES.block_size
 
-    def decrypt(self, ciphertext: bytes, finalize=True) -> bytes:
-        if not isinstance(ciphertext, bytes):
-            raise HTypeError("ciphertext", ciphertext, bytes)
+        aes = Cipher(
+            self._algorithm,
+            modes.CTR(counter.to_bytes(block_size, "big")),
+            default_backend()
+        )
+
+        if process is CipherProcess.ENCRYPT:
+            context = aes.encryptor()
+        else:
+            context = aes.decryptor()
+
+        if skip:
+            context.update(b"\x00" * skip)
+
+        return context
+
+    def _set_context(self, offset: int) -> None:
+        if offset:
+            context = self._context_at(offset, self._in_process)
+        elif self._in_process is CipherProcess.ENCRYPT:
+            context = self._aes.encryptor()
+        else:
+            context = self._aes.decryptor()
+
+        if self._in_process is CipherProcess.ENCRYPT:
+            self._encryptor = context
+        else:
+            self._decryptor = context
+
+    def seek(self, offset: int) -> None:
+        """Move the current process to the byte at offset of the stream, so that
+        the next encrypt()/decrypt() processes the data from that position."""
+        if not isinstance(offset, int):
+            raise HTypeError("offset", offset, int)
+
+        if offset < 0:
+            raise CipherParameterError("Parameter offset expected a non-negative integer.")
+
+        if self._aes is None:
+            raise CipherParameterError("Please set nonce "
+            "value before calling seek().")
+
+        if self._in_process is CipherProcess.FINALIZED:
+            raise ResetError("You are in {} process, please call reset() "
+            "before calling seek().".format(self._in_process.name))
+
+        self._offset = offset
+        if self._in_process is not CipherProcess.NONE:
+            self._set_context(offset)
+
+    def encrypt_at(self, offset: int, plaintext: BytesLike) -> bytes:
+        """Encrypt the plaintext as if it was at offset of the stream. This method
+        does not change the current process."""
+        return self._crypt_at(offset, plaintext, CipherProcess.ENCRYPT, "encrypt_at")
+
+    def decrypt_at(self, offset: int, ciphertext: BytesLike) -> bytes:
+        """Decrypt the ciphertext which is at offset of the stream. This method
+        does not change the current process."""
+        return self._crypt_at(offset, ciphertext, CipherProcess.DECRYPT, "decrypt_at")
+
+    def _crypt_at(self, offset: int, data: BytesLike, process: CipherProcess, caller: str) -> bytes:
+        if not isinstance(offset, int):
+            raise HTypeError("offset", offset, int)
+
+        if not is_bytes_like(data):
+            raise HTypeError("data", data, "bytes-like object")
+
+        if offset < 0:
+            raise CipherParameterError("Parameter offset expected a non-negative integer.")
 
         if not self._key:
-            raise KeyError("Please provide key before "
-            "calling decrypt()")
+            raise KeyError("Please provide key before calling {}()".format(caller))
 
         if self._aes is None:
             raise CipherParameterError("Please set nonce "
-            "value before calling decrypt().")
+            "value before calling {}().".format(caller))
+
+        if self._number_of_segments(data) > 1:
+            return self._parallel_update(offset, process, data)
+
+        context = self._context_at(offset, process)
+        return context.update(data) + context.finalize()
+
+    def _number_of_segments(self, data: BytesLike) -> int:
+        if self._workers == 1:
+            return 1
+
+        return max(1, min(self._workers, memoryview(data).nbytes // AES_CTR.SEGMENT_SIZE))
+
+    def _parallel_update_into(self,
+                offset: int,
+                process: CipherProcess,
+                data: BytesLike,
+                view: memoryview
+            ) -> int:
+        data = memoryview(data).cast("B")
+        if len(view) < len(data):
+            raise BufferIsTooSmallError("The buffer is too small (expected >= {} "
+            "bytes, but got {} bytes).".format(len(data), len(view)))
+
+        block_size = algorithms.AES.block_size // 8
+        nsegments = self._number_of_segments(data)
+        segment_size = ceil_div(ceil_div(len(data), nsegments), block_size) * block_size
+
+        def update_segment(start: int) -> int:
+            context = self._context_at(offset + start, process)
+            return _update_into(context, data[start : start + segment_size], view[start:])
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self._workers)
+
+        return sum(self._executor.map(update_segment, range(0, len(data), segment_size)))
+
+    def _shutdown_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _parallel_update(self, offset: int, process: CipherProcess, data: BytesLike) -> bytes:
+        # Leave the slack which is required by update_into().
+        output = bytearray(memoryview(data).nbytes + algorithms.AES.block_size // 8 - 1)
+        view = memoryview(output)
+        nbytes = self._parallel_update_into(offset, process, data, view)
+        return bytes(view[:nbytes])
+
+    def _update(self, process: CipherProcess, context: CipherContext, data: BytesLike) -> bytes:
+        if self._number_of_segments(data) > 1:
+            output = self._parallel_update(self._offset, process, data)
+            self._offset += len(output)
+            self._set_context(self._offset)
+        else:
+            output = context.update(data)
+            self._offset += len(output)
+
+        return output
+
+    def _update_into_view(self,
+                process: CipherProcess,
+                context: CipherContext,
+                data: BytesLike,
+                view: memoryview
+            ) -> int:
+        if self._number_of_segments(data) > 1:
+            nbytes = self._parallel_update_into(self._offset, process, data, view)
+            self._offset += nbytes
+            self._set_context(self._offset)
+        else:
+            nbytes = _update_into(context, data, view)
+            self._offset += nbytes
 
-        if self._in_process is CipherProcess.NONE:
-            self._in_process = CipherProcess.DECRYPT
-            self._decryptor = self._aes.decryptor()
+        return nbytes
+
+    def encrypt(self, plaintext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
+
+        encryptor = self._get_context(CipherProcess.ENCRYPT, "encrypt")
+        ciphertext = self._update(CipherProcess.ENCRYPT, encryptor, plaintext)
+
+        if finalize:
+            ciphertext += self.finalize()
+
+        return ciphertext
+
+    def decrypt(self, ciphertext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
+
+        decryptor = self._get_context(CipherProcess.DECRYPT, "decrypt")
+        plaintext = self._update(CipherProcess.DECRYPT, decryptor, ciphertext)
 
-        if self._in_process is not CipherProcess.DECRYPT:
-            raise ResetError("You are in {} process, please "
-            "call reset() before calling decrypt()".format(self._in_process.name))
-        
-        plaintext = self._decryptor.update(ciphertext)
-        
         if finalize:
             plaintext += self.finalize()
 
         return plaintext
 
+    def encrypt_into(self, plaintext: BytesLike, buffer: WritableBuffer, finalize=True) -> int:
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
+
+        view = HKSCipher._writable_view(buffer)
+        encryptor = self._get_context(CipherProcess.ENCRYPT, "encrypt_into")
+        nbytes = self._update_into_view(CipherProcess.ENCRYPT, encryptor, plaintext, view)
+
+        if finalize:
+            nbytes += HKSCipher._write_into(self.finalize(), view[nbytes:])
+
+        return nbytes
+
+    def decrypt_into(self, ciphertext: BytesLike, buffer: WritableBuffer, finalize=True) -> int:
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
+
+        view = HKSCipher._writable_view(buffer)
+        decryptor = self._get_context(CipherProcess.DECRYPT, "decrypt_into")
+        nbytes = self._update_into_view(CipherProcess.DECRYPT, decryptor, ciphertext, view)
+
+        if finalize:
+            nbytes += HKSCipher._write_into(self.finalize(), view[nbytes:])
+
+        return nbytes
+
+    def encrypt_many(self, messages: Iterable[BytesLike]) -> List[Tuple[bytes, bytes]]:
+        """Encrypt each message with a fresh nonce. Return a list of
+        (nonce, ciphertext) pairs. The current nonce is not changed."""
+        if self._in_process not in (CipherProcess.NONE, CipherProcess.FINALIZED):
+            raise FinalizeCipherError("Please finalize() the process "
+            "before calling encrypt_many().")
+
+        messages = _check_messages(messages)
+        block_size = algorithms.AES.block_size // 8
+        random_bytes = os.urandom(block_size * len(messages))
+        nonces = [random_bytes[i : i + block_size] for i in range(0, len(random_bytes), block_size)]
+
+        return list(zip(nonces, self._crypt_many(nonces, messages)))
+
+    def decrypt_many(self, pairs: Iterable[Tuple[bytes, BytesLike]]) -> List[bytes]:
+        """Decrypt the (nonce, ciphertext) pairs returned by encrypt_many().
+        The current nonce is not changed."""
+        if self._in_process not in (CipherProcess.NONE, CipherProcess.FINALIZED):
+            raise FinalizeCipherError("Please finalize() the process "
+            "before calling decrypt_many().")
+
+        pairs = _check_pairs(pairs)
+        nonces = [nonce for nonce, _ in pairs]
+        ciphertexts = [ciphertext for _, ciphertext in pairs]
+
+        return self._crypt_many(nonces, ciphertexts)
+
+    def _crypt_many(self, nonces: List[bytes], datas: List[BytesLike]) -> List[bytes]:
+        # Creating a CipherContext (the key setup in OpenSSL) costs much more
+        # than encrypting a small message. So the keystream of all small
+        # messages is computed by only one ECB context over their counter
+        # blocks, the other messages use their own CTR context.
+        block_size = algorithms.AES.block_size // 8
+        counter_mask = (1 << algorithms.AES.block_size) - 1
+        backend = default_backend()
+
+        counters = bytearray()
+        for nonce, data in zip(nonces, datas):
+            size = memoryview(data).nbytes
+            if size <= AES_CTR.BATCH_MESSAGE_SIZE:
+                start = int.from_bytes(nonce, "big")
+                for i in range(ceil_div(size, block_size)):
+                    counters += ((start + i) & counter_mask).to_bytes(block_size, "big")
+
+        keystream = Cipher(self._algorithm, modes.ECB(), backend).encryptor().update(counters)
+
+        result = []
+        position = 0
+        for nonce, data in zip(nonces, datas):
+            size = memoryview(data).nbytes
+            if size <= AES_CTR.BATCH_MESSAGE_SIZE:
+                stream = int.from_bytes(keystream[position : position + size], "big")
+                block = int.from_bytes(data, "big")
+                result.append((block ^ stream).to_bytes(size, "big"))
+                position += ceil_div(size, block_size) * block_size
+            else:
+                context = Cipher(self._algorithm, modes.CTR(nonce), backend).encryptor()
+                result.append(context.update(data) + context.finalize())
+
+        return result
+
     def finalize(self) -> bytes:
         if self._aes is None:
             raise CipherParameterError("Please set nonce value "
@@ -243,6 +578,7 @@ class AES_CTR(HKSCipher):
         else:
             raise SymmetricError("Unknown process ({}).".format(self._in_process.name))
 
+        self._shutdown_executor()
         self._in_process = CipherProcess.FINALIZED
         return finaltext
 
@@ -259,12 +595,11 @@ class AES_CTR(HKSCipher):
                         algorithms.AES.block_size
                 ))
 
-            self._nonce = param
-            self._aes = Cipher(
-                algorithms.AES(self._key),
-                modes.CTR(self._nonce),
-                default_backend()
-            )
+            # Avoid rebuilding the Cipher object if the nonce is not changed,
+            # e.g. in reset(auto_renew_params=False).
+            if self._aes is None or param != self._nonce:
+                self._nonce = param
+                self._aes = Cipher(self._algorithm, modes.CTR(self._nonce), default_backend())
         else:
             raise CipherParameterError("AES only use the nonce "
             "value as its parameter.")
@@ -286,8 +621,10 @@ class AES_CTR(HKSCipher):
         else:
             new_nonce = self._nonce
 
+        self._shutdown_executor()
         self._encryptor = None
         self._decryptor = None
+        self._offset = 0
         self._in_process = CipherProcess.NONE
         if new_nonce:
             self.set_param(0, new_nonce)
@@ -306,20 +643,24 @@ class AES_CBC(HKSCipher):
                 len(key)
             ))
         super().__init__(key, number_of_params=1)
+        # The key-bound algorithm is shared by all Cipher objects of this key.
+        self._algorithm = algorithms.AES(key)
         self._aes = None
         self._encryptor = None
         self._decryptor = None
 
         self._in_process = CipherProcess.NONE
 
-        self._pkcs7 = padding.PKCS7(128)
-        self._padder = None
+        # The PKCS7 padding is computed from the plaintext length in
+        # finalize(), so no padder object is needed in the encryption.
+        self._length = 0
+        self._pkcs7 = padding.PKCS7(algorithms.AES.block_size)
         self._unpadder = None
         self._iv = None
 
-    def encrypt(self, plaintext: bytes, finalize=True) -> bytes:
-        if not isinstance(plaintext, bytes):
-            raise HTypeError("plaintext", plaintext, bytes)
+    def encrypt(self, plaintext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
 
         if not self._key:
             raise KeyError("Please provide key before calling encrypt()")
@@ -331,23 +672,23 @@ class AES_CBC(HKSCipher):
         if self._in_process is CipherProcess.NONE:
             self._in_process = CipherProcess.ENCRYPT
             self._encryptor = self._aes.encryptor()
-            self._padder = self._pkcs7.padder()
+            self._length = 0
 
         if self._in_process is not CipherProcess.ENCRYPT:
             raise ResetError("You are in {} process, please call reset() "
             "before calling decrypt().".format(self._in_process.name))
 
-        text = self._padder.update(plaintext)
-        ciphertext = self._encryptor.update(text)
-        
+        self._length += memoryview(plaintext).nbytes
+        ciphertext = self._encryptor.update(plaintext)
+
         if finalize:
             ciphertext += self.finalize()
 
         return ciphertext
 
-    def decrypt(self, ciphertext: bytes, finalize=True) -> bytes:
-        if not isinstance(ciphertext, bytes):
-            raise HTypeError("ciphertext", ciphertext, bytes)
+    def decrypt(self, ciphertext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
 
         if not self._key:
             raise KeyError("Please provide key before calling decrypt()")
@@ -373,18 +714,90 @@ class AES_CBC(HKSCipher):
 
         return plaintext
 
+    def encrypt_into(self, plaintext: BytesLike, buffer: WritableBuffer, finalize=True) -> int:
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
+
+        if not self._key:
+            raise KeyError("Please provide key before calling encrypt_into()")
+
+        if self._aes is None:
+            raise CipherParameterError("Please set iv value "
+            "before calling encrypt_into().")
+
+        view = HKSCipher._writable_view(buffer)
+
+        if self._in_process is CipherProcess.NONE:
+            self._in_process = CipherProcess.ENCRYPT
+            self._encryptor = self._aes.encryptor()
+            self._length = 0
+
+        if self._in_process is not CipherProcess.ENCRYPT:
+            raise ResetError("You are in {} process, please call reset() "
+            "before calling encrypt_into().".format(self._in_process.name))
+
+        self._length += memoryview(plaintext).nbytes
+        nbytes = _update_into(self._encryptor, plaintext, view)
+
+        if finalize:
+            nbytes += HKSCipher._write_into(self.finalize(), view[nbytes:])
+
+        return nbytes
+
+    def encrypt_many(self, messages: Iterable[BytesLike]) -> List[Tuple[bytes, bytes]]:
+        """Encrypt each message with a fresh IV. Return a list of
+        (iv, ciphertext) pairs. The current IV is not changed."""
+        if self._in_process not in (CipherProcess.NONE, CipherProcess.FINALIZED):
+            raise FinalizeCipherError("Please finalize() the process "
+            "before calling encrypt_many().")
+
+        messages = _check_messages(messages)
+        block_size = algorithms.AES.block_size // 8
+        ivs = os.urandom(block_size * len(messages))
+        backend = default_backend()
+
+        result = []
+        for i, message in enumerate(messages):
+            iv = ivs[i * block_size : (i + 1) * block_size]
+            padding_size = block_size - memoryview(message).nbytes % block_size
+            encryptor = Cipher(self._algorithm, modes.CBC(iv), backend).encryptor()
+            ciphertext = encryptor.update(message)
+            ciphertext += encryptor.update(bytes([padding_size]) * padding_size)
+            result.append((iv, ciphertext + encryptor.finalize()))
+
+        return result
+
+    def decrypt_many(self, pairs: Iterable[Tuple[bytes, BytesLike]]) -> List[bytes]:
+        """Decrypt the (iv, ciphertext) pairs returned by encrypt_many().
+        The current IV is not changed."""
+        if self._in_process not in (CipherProcess.NONE, CipherProcess.FINALIZED):
+            raise FinalizeCipherError("Please finalize() the process "
+            "before calling decrypt_many().")
+
+        pairs = _check_pairs(pairs)
+        backend = default_backend()
+
+        result = []
+        for iv, ciphertext in pairs:
+            decryptor = Cipher(self._algorithm, modes.CBC(iv), backend).decryptor()
+            unpadder = self._pkcs7.unpadder()
+            padded_text = decryptor.update(ciphertext) + decryptor.finalize()
+            result.append(unpadder.update(padded_text) + unpadder.finalize())
+
+        return result
+
     def finalize(self) -> bytes:
         if self._aes is None:
             raise FinalizeCipherError("Please set nonce value "
             "before calling finalize().")
 
         if self._in_process is CipherProcess.ENCRYPT:
-            text = self._padder.finalize()
-            finaltext = self._encryptor.update(text)
+            block_size = algorithms.AES.block_size // 8
+            padding_size = block_size - self._length % block_size
+            finaltext = self._encryptor.update(bytes([padding_size]) * padding_size)
             finaltext += self._encryptor.finalize()
 
             self._encryptor = None
-            self._padder = None
 
         elif self._in_process is CipherProcess.DECRYPT:
             padded_text = self._decryptor.finalize()
@@ -417,12 +830,11 @@ class AES_CBC(HKSCipher):
                     )
                 )
 
-            self._iv = param
-            self._aes = Cipher(
-                algorithms.AES(self._key),
-                modes.CBC(self._iv),
-                default_backend()
-            )
+            # Avoid rebuilding the Cipher object if the IV is not changed,
+            # e.g. in reset(auto_renew_params=False).
+            if self._aes is None or param != self._iv:
+                self._iv = param
+                self._aes = Cipher(self._algorithm, modes.CBC(self._iv), default_backend())
         else:
             raise CipherParameterError("AES CBC only use the "
             "IV value as its parameter.")
@@ -446,7 +858,6 @@ class AES_CBC(HKSCipher):
         
         self._encryptor = None
         self._decryptor = None
-        self._padder = None
         self._unpadder = None
         self._in_process = CipherProcess.NONE
         if new_iv:
@@ -455,18 +866,21 @@ class AES_CBC(HKSCipher):
 
 @CipherID.register
 class HybridCipher(HKSCipher):
-    def __init__(self, cipher_obj: HKSCipher, hash_obj: HKSHash = SHA256()):
+    def __init__(self, cipher_obj: HKSCipher, hash_obj: HKSHash = None):
         super().__init__(None, cipher_obj._number_of_params)
         self._cipher = cipher_obj
-        self._hash = hash_obj
+
+        # Each object needs its own hash object (the default one
+        # must not be shared between HybridCipher objects).
+        self._hash = hash_obj if hash_obj is not None else SHA256()
 
         self._in_process = CipherProcess.NONE
 
         self._stored_digest = None
 
-    def encrypt(self, plaintext: bytes, finalize=True) -> bytes:
-        if not isinstance(plaintext, bytes):
-            raise HTypeError("plaintext", plaintext, bytes)
+    def encrypt(self, plaintext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
 
         # ciphertext = E(plaintext + hash(plaintext))
         if self._in_process is CipherProcess.NONE:
@@ -484,9 +898,9 @@ class HybridCipher(HKSCipher):
 
         return ciphertext
 
-    def decrypt(self, ciphertext: bytes, finalize=True) -> bytes:
-        if not isinstance(ciphertext, bytes):
-            raise HTypeError("ciphertext", ciphertext, bytes)
+    def decrypt(self, ciphertext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
 
         if self._in_process is CipherProcess.NONE:
             self._in_process = CipherProcess.DECRYPT
@@ -515,7 +929,6 @@ class HybridCipher(HKSCipher):
         if self._in_process is CipherProcess.ENCRYPT:
             msg_digest = self._hash.finalize()
             finaltext = self._cipher.encrypt(msg_digest, finalize=True)
-            return finaltext
 
         elif self._in_process is CipherProcess.DECRYPT:
             plaintext = self._cipher.finalize()
@@ -545,6 +958,41 @@ class HybridCipher(HKSCipher):
         self._in_process = CipherProcess.FINALIZED
         return finaltext
 
+    def encrypt_many(self, messages: Iterable[BytesLike]) -> List[Tuple[bytes, bytes]]:
+        """Encrypt each message (followed by its digest) with fresh parameters
+        of the inner cipher. Return the pairs given by the inner cipher."""
+        if self._in_process not in (CipherProcess.NONE, CipherProcess.FINALIZED):
+            raise FinalizeCipherError("Please finalize() the process "
+            "before calling encrypt_many().")
+
+        packets = []
+        for message in _check_messages(messages):
+            self._hash.reset()
+            packets.append(bytes(message) + self._hash.finalize(message))
+        self._hash.reset()
+
+        return self._cipher.encrypt_many(packets)
+
+    def decrypt_many(self, pairs: Iterable[Tuple[bytes, BytesLike]]) -> List[bytes]:
+        "Decrypt and authenticate the pairs returned by encrypt_many()."
+        if self._in_process not in (CipherProcess.NONE, CipherProcess.FINALIZED):
+            raise FinalizeCipherError("Please finalize() the process "
+            "before calling decrypt_many().")
+
+        digest_size = self._hash.digest_size
+        result = []
+        for packet in self._cipher.decrypt_many(pairs):
+            plaintext = packet[:-digest_size]
+            self._hash.reset()
+            if len(packet) < digest_size or self._hash.finalize(plaintext) != packet[-digest_size:]:
+                self._hash.reset()
+                raise UnAuthenticatedPacketError("Packet authentication fails.")
+
+            result.append(plaintext)
+        self._hash.reset()
+
+        return result
+
     def set_param(self, index: int, param: bytes) -> None:
         return self._cipher.set_param(index, param)
 
@@ -556,3 +1004,264 @@ class HybridCipher(HKSCipher):
         self._cipher.reset(auto_renew_params)
         self._stored_digest = None
         self._in_process = CipherProcess.NONE
+
+
+class AEADCipher(HKSCipher):
+    """Abstract class: NEVER USE.\n
+    A streaming authenticated cipher. The ciphertext is followed by a
+    TAG_SIZE-byte authentication tag, which is produced by finalize()
+    in the encryption process and checked by finalize() in the
+    decryption process. Like HybridCipher, the decrypted chunks are
+    returned before the tag is verified, so they MUST NOT be trusted
+    until finalize() succeeds."""
+    KEY_SIZES = ()
+    NONCE_SIZE = 12
+    TAG_SIZE = 16
+
+    def __init__(self, key: bytes):
+        if not isinstance(key, bytes):
+            raise HTypeError("key", key, bytes)
+
+        if len(key) not in self.KEY_SIZES:
+            raise CipherParameterError("Key size of {} must be in {} (bytes), "
+            "not {} (bytes).".format(type(self).__name__, self.KEY_SIZES, len(key)))
+
+        super().__init__(key, number_of_params=1)
+        self._in_process: CipherProcess = CipherProcess.NONE
+        self._nonce: bytes = None
+
+        # The last TAG_SIZE bytes received in the decryption process.
+        self._tail: bytes = None
+
+    def _start(self, process: CipherProcess) -> None:
+        raise NotImplementedError()
+
+    def _update(self, data: BytesLike) -> bytes:
+        raise NotImplementedError()
+
+    def _compute_tag(self) -> bytes:
+        raise NotImplementedError()
+
+    def _verify_tag(self, tag: bytes) -> None:
+        raise NotImplementedError()
+
+    def _begin(self, process: CipherProcess, caller: str) -> None:
+        if not self._key:
+            raise KeyError("Please provide key before calling {}()".format(caller))
+
+        if self._nonce is None:
+            raise CipherParameterError("Please set nonce "
+            "value before calling {}().".format(caller))
+
+        if self._in_process is CipherProcess.NONE:
+            self._in_process = process
+            self._tail = b""
+            self._start(process)
+
+        if self._in_process is not process:
+            raise ResetError("You are in {} process, please call reset() "
+            "before calling {}().".format(self._in_process.name, caller))
+
+    def encrypt(self, plaintext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(plaintext):
+            raise HTypeError("plaintext", plaintext, "bytes-like object")
+
+        self._begin(CipherProcess.ENCRYPT, "encrypt")
+        ciphertext = self._update(plaintext)
+
+        if finalize:
+            ciphertext += self.finalize()
+
+        return ciphertext
+
+    def decrypt(self, ciphertext: BytesLike, finalize=True) -> bytes:
+        if not is_bytes_like(ciphertext):
+            raise HTypeError("ciphertext", ciphertext, "bytes-like object")
+
+        self._begin(CipherProcess.DECRYPT, "decrypt")
+
+        # Hold back the last TAG_SIZE bytes, they may be the tag.
+        view = memoryview(ciphertext).cast("B")
+        if len(view) >= self.TAG_SIZE:
+            pending, self._tail = self._tail, bytes(view[-self.TAG_SIZE:])
+            if pending:
+                plaintext = self._update(pending) + self._update(view[:-self.TAG_SIZE])
+            else:
+                plaintext = self._update(view[:-self.TAG_SIZE])
+        else:
+            data = self._tail + bytes(view)
+            self._tail = data[-self.TAG_SIZE:]
+            plaintext = self._update(data[:-self.TAG_SIZE])
+
+        if finalize:
+            plaintext += self.finalize()
+
+        return plaintext
+
+    def finalize(self) -> bytes:
+        if self._in_process is CipherProcess.ENCRYPT:
+            finaltext = self._compute_tag()
+
+        elif self._in_process is CipherProcess.DECRYPT:
+            # The process is over even if the authentication fails.
+            tag, self._tail = self._tail, None
+            self._in_process = CipherProcess.FINALIZED
+
+            if len(tag) != self.TAG_SIZE:
+                raise UnAuthenticatedPacketError("Packet authentication fails "
+                "(the tag is missing).")
+
+            self._verify_tag(tag)
+            finaltext = b""
+
+        elif self._in_process is CipherProcess.FINALIZED:
+            raise ResetError("Unknown process in your object "
+            "({}).".format(self._in_process.name))
+        else:
+            raise SymmetricError("Unknown process ({}).".format(self._in_process.name))
+
+        self._in_process = CipherProcess.FINALIZED
+        return finaltext
+
+    def set_param(self, index: int, param: bytes) -> None:
+        if not isinstance(param, bytes):
+            raise CipherParameterError("Parameters of {} must "
+            "be a bytes object.".format(type(self).__name__))
+
+        if index == 0:
+            if len(param) != self.NONCE_SIZE:
+                raise CipherParameterError("Invalid length of nonce value "
+                "({} bytes), expected {} bytes.".format(len(param), self.NONCE_SIZE))
+
+            self._nonce = param
+        else:
+            raise CipherParameterError("{} only use the nonce value "
+            "as its parameter.".format(type(self).__name__))
+
+    def get_param(self, index: int) -> bytes:
+        if index == 0:
+            return self._nonce
+        else:
+            raise CipherParameterError("{} only use the nonce value "
+            "as its parameter.".format(type(self).__name__))
+
+    def reset(self, auto_renew_params: bool = True):
+        if self._in_process not in (CipherProcess.NONE, CipherProcess.FINALIZED):
+            raise FinalizeCipherError("Please finalize() the process "
+            "before calling reset().")
+
+        if auto_renew_params:
+            new_nonce = os.urandom(self.NONCE_SIZE)
+        else:
+            new_nonce = self._nonce
+
+        self._tail = None
+        self._in_process = CipherProcess.NONE
+        if new_nonce:
+            self.set_param(0, new_nonce)
+
+
+@CipherID.register
+class AES_GCM(AEADCipher):
+    "AES in Galois/Counter Mode, the ciphertext is followed by a 16-byte tag."
+    KEY_SIZES = (16, 24, 32)
+
+    def __init__(self, key: bytes):
+        super().__init__(key)
+        self._context: CipherContext = None
+
+    def _start(self, process: CipherProcess) -> None:
+        aes = Cipher(algorithms.AES(self._key), modes.GCM(self._nonce), default_backend())
+        if process is CipherProcess.ENCRYPT:
+            self._context = aes.encryptor()
+        else:
+            self._context = aes.decryptor()
+
+    def _update(self, data: BytesLike) -> bytes:
+        return self._context.update(data)
+
+    def _compute_tag(self) -> bytes:
+        finaltext = self._context.finalize() + self._context.tag
+        self._context = None
+        return finaltext
+
+    def _verify_tag(self, tag: bytes) -> None:
+        try:
+            self._context.finalize_with_tag(tag)
+        except InvalidTag:
+            raise UnAuthenticatedPacketError("Packet authentication fails.")
+        finally:
+            self._context = None
+
+    def reset(self, auto_renew_params: bool = True):
+        super().reset(auto_renew_params)
+        self._context = None
+
+
+@CipherID.register
+class ChaCha20_Poly1305(AEADCipher):
+    """ChaCha20-Poly1305 (RFC 8439) without associated data, the ciphertext
+    is followed by a 16-byte tag. The output is the same as the one of
+    cryptography's ChaCha20Poly1305, but it can be computed chunk by chunk."""
+    KEY_SIZES = (32,)
+
+    def __init__(self, key: bytes):
+        super().__init__(key)
+        self._context: CipherContext = None
+        self._poly1305: poly1305.Poly1305 = None
+        self._length: int = 0
+
+    def _start(self, process: CipherProcess) -> None:
+        # The block 0 of the keystream is the one-time Poly1305 key,
+        # the payload is encrypted from the block 1.
+        counter0 = Cipher(
+            algorithms.ChaCha20(self._key, b"\x00" * 4 + self._nonce),
+            None,
+            default_backend()
+        ).encryptor()
+        self._poly1305 = poly1305.Poly1305(counter0.update(b"\x00" * 32))
+
+        self._context = Cipher(
+            algorithms.ChaCha20(self._key, b"\x01\x00\x00\x00" + self._nonce),
+            None,
+            default_backend()
+        ).encryptor()
+        self._length = 0
+
+    def _update(self, data: BytesLike) -> bytes:
+        if self._in_process is CipherProcess.DECRYPT:
+            self._poly1305.update(data)
+
+        output = self._context.update(data)
+
+        if self._in_process is CipherProcess.ENCRYPT:
+            self._poly1305.update(output)
+
+        self._length += len(output)
+        return output
+
+    def _mac_trailer(self) -> bytes:
+        padding_size = (16 - self._length % 16) % 16
+        return b"\x00" * padding_size + struct.pack("<QQ", 0, self._length)
+
+    def _compute_tag(self) -> bytes:
+        self._poly1305.update(self._mac_trailer())
+        tag = self._poly1305.finalize()
+        self._poly1305 = None
+        self._context = None
+        return tag
+
+    def _verify_tag(self, tag: bytes) -> None:
+        self._poly1305.update(self._mac_trailer())
+        try:
+            self._poly1305.verify(tag)
+        except InvalidSignature:
+            raise UnAuthenticatedPacketError("Packet authentication fails.")
+        finally:
+            self._poly1305 = None
+            self._context = None
+
+    def reset(self, auto_renew_params: bool = True):
+        super().reset(auto_renew_params)
+        self._poly1305 = None
+        self._context = None
@@ -0,0 +1,333 @@
+"""
+A chunked encrypted container.\n
+Layout (all integers are big-endian):
+- Header: `MAGIC | version (1 byte) | CipherID hash (2 bytes) | chunk size
+(4 bytes) | container id (16 random bytes)`.
+- Chunks: each chunk is encrypted independently with fresh parameters,
+its record is `(param length (2 bytes) | param) * number of params | ciphertext`.
+The encrypted plaintext is `container id | chunk number (8 bytes) | last
+chunk flag (1 byte) | chunk`, so a record cannot be moved to another
+position or container, and the container cannot be truncated by
+rewriting the index, without failing read_chunk() (the modified records
+are detected by an AEAD cipher). The last chunk is always written (it
+may be empty), so a valid container has at least one chunk.
+- Index: one `record offset (8 bytes) | record size (8 bytes) | plaintext
+size (8 bytes)` entry per chunk.
+- Trailer: `number of chunks (8 bytes) | index offset (8 bytes) | MAGIC`.
+
+Any chunk can be located by the index and decrypted without scanning the
+container.
+"""
+
+import io as IO
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, List, Sequence, Tuple, Union
+
+from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+
+from hks_pylib.utils import BytesLike, is_bytes_like
+from hks_pylib.files.generator import BytesGenerator, ReadableIO
+from hks_pylib.cryptography.ciphers import HKSCipher
+from hks_pylib.cryptography.ciphers.cipherid import CipherID
+
+from hks_pylib.errors.cryptography.container import ContainerError, ContainerFormatError
+
+
+MAGIC = b"HKSC"
+VERSION = 1
+
+_HEADER = struct.Struct(">4sB2sI16s")
+_CHUNK_PREFIX = struct.Struct(">16sQ?")
+_PARAM_SIZE = struct.Struct(">H")
+_INDEX_ENTRY = struct.Struct(">QQQ")
+_TRAILER = struct.Struct(">QQ4s")
+
+WritableIO = Union[str, IO.BufferedIOBase, BinaryIO]
+
+
+def _cipher_hash(cipher: HKSCipher) -> bytes:
+    cipher_hash = CipherID.cls2hash(type(cipher))
+    if cipher_hash is None:
+        raise ContainerError("The cipher {} is not registered "
+        "in CipherID.".format(type(cipher).__name__))
+
+    return cipher_hash
+
+
+class ContainerWriter(object):
+    def __init__(self, cipher: HKSCipher, io: WritableIO, chunk_size: int = 1024 * 1024) -> None:
+        if not isinstance(cipher, HKSCipher):
+            raise HTypeError("cipher", cipher, HKSCipher)
+
+        if not isinstance(chunk_size, int):
+            raise HTypeError("chunk_size", chunk_size, int)
+
+        if not 0 < chunk_size < 1 << 32:
+            raise HFormatError("Parameter chunk_size expected a positive 32-bit integer.")
+
+        if isinstance(io, str):
+            self._stream = open(io, "wb")
+            self._own_stream = True
+        elif hasattr(io, "write"):
+            self._stream = io
+            self._own_stream = False
+        else:
+            raise HTypeError("io", io, WritableIO)
+
+        self._cipher = cipher
+        self._chunk_size = chunk_size
+
+        self._buffer = bytearray()
+        self._index: List[Tuple[int, int, int]] = []
+        self._position = 0
+        self._closed = False
+
+        self._container_id = os.urandom(16)
+        self._write(_HEADER.pack(MAGIC, VERSION, _cipher_hash(cipher), chunk_size, self._container_id))
+
+    def _write(self, data: BytesLike) -> None:
+        self._stream.write(data)
+        self._position += memoryview(data).nbytes
+
+    def _write_chunk(self, chunk: BytesLike, last: bool) -> None:
+        self._cipher.reset()
+        prefix = _CHUNK_PREFIX.pack(self._container_id, len(self._index), last)
+        ciphertext = self._cipher.encrypt(prefix, finalize=False)
+        ciphertext += self._cipher.encrypt(chunk)
+
+        offset = self._position
+        for i in range(self._cipher._number_of_params):
+            param = self._cipher.get_param(i)
+            self._write(_PARAM_SIZE.pack(len(param)))
+            self._write(param)
+        self._write(ciphertext)
+
+        plaintext_size = memoryview(chunk).nbytes
+        self._index.append((offset, self._position - offset, plaintext_size))
+
+    def write(self, data: BytesLike) -> None:
+        if not is_bytes_like(data):
+            raise HTypeError("data", data, "bytes-like object")
+
+        if self._closed:
+            raise ContainerError("The container has been closed.")
+
+        self._buffer += data
+        if len(self._buffer) <= self._chunk_size:
+            return
+
+        # Keep the last full chunk in the buffer, it is written by close()
+        # if it is the last chunk of the container.
+        view = memoryview(self._buffer)
+        nchunks = (len(self._buffer) - 1) // self._chunk_size
+        for i in range(nchunks):
+            self._write_chunk(view[i * self._chunk_size : (i + 1) * self._chunk_size], False)
+        view.release()
+
+        del self._buffer[:nchunks * self._chunk_size]
+
+    def write_from(self, generator: BytesGenerator) -> None:
+        if not isinstance(generator, BytesGenerator):
+            raise HTypeError("generator", generator, BytesGenerator)
+
+        for data in generator.iter(self._chunk_size):
+            self.write(data)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+
+        # The last chunk is always written, even if it is empty, so that
+        # a container whose chunks are all stripped is detected.
+        self._write_chunk(bytes(self._buffer), True)
+        self._buffer = bytearray()
+
+        index_offset = self._position
+        for entry in self._index:
+            self._write(_INDEX_ENTRY.pack(*entry))
+        self._write(_TRAILER.pack(len(self._index), index_offset, MAGIC))
+
+        if self._own_stream:
+            self._stream.close()
+        else:
+            self._stream.flush()
+
+        self._closed = True
+
+    def abort(self) -> None:
+        """Stop writing without the last chunk, the index and the trailer,
+        so the output is not a valid container."""
+        if self._closed:
+            return
+
+        self._buffer = bytearray()
+        if self._own_stream:
+            self._stream.close()
+
+        self._closed = True
+
+    def __enter__(self) -> "ContainerWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # Do not commit the partial data as a complete container.
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class ContainerReader(BytesGenerator):
+    """Read the plaintext of a container. read() and iter() return the
+    plaintext sequentially, read_chunk() and read_chunks() decrypt any
+    chunk directly."""
+    def __init__(self, cipher: HKSCipher, io: ReadableIO) -> None:
+        if not isinstance(cipher, HKSCipher):
+            raise HTypeError("cipher", cipher, HKSCipher)
+
+        super().__init__(io)
+        self._cipher = cipher
+        self._lock = threading.Lock()
+
+        if isinstance(self._stream, bytearray):
+            self._begin = 0
+            self._size = len(self._stream)
+        else:
+            self._begin = self._beigin_position
+            self._size = self._stream.seek(0, IO.SEEK_END) - self._begin
+
+        if self._size < _HEADER.size + _TRAILER.size:
+            raise ContainerFormatError("The container is too short.")
+
+        header = self._read_raw(0, _HEADER.size)
+        magic, version, cipher_hash, self._chunk_size, self._container_id = _HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ContainerFormatError("Invalid container header.")
+
+        if cipher_hash != _cipher_hash(cipher):
+            raise ContainerError("The container is encrypted by {}, not by {}.".format(
+                CipherID.cls2name(CipherID.hash2cls(cipher_hash)),
+                type(cipher).__name__
+            ))
+
+        trailer = self._read_raw(self._size - _TRAILER.size, _TRAILER.size)
+        nchunks, index_offset, magic = _TRAILER.unpack(trailer)
+        if magic != MAGIC or index_offset + nchunks * _INDEX_ENTRY.size + _TRAILER.size != self._size:
+            raise ContainerFormatError("Invalid container trailer.")
+
+        # A container has at least its last chunk.
+        if nchunks == 0:
+            raise ContainerFormatError("The container has no chunk.")
+
+        index = self._read_raw(index_offset, nchunks * _INDEX_ENTRY.size)
+        self._index = list(_INDEX_ENTRY.iter_unpack(index))
+
+        # The state of the sequential read().
+        self._next_chunk = 0
+        self._pending = memoryview(b"")
+
+    def _read_raw(self, offset: int, size: int) -> bytes:
+        with self._lock:
+            if isinstance(self._stream, bytearray):
+                return bytes(self._stream[offset : offset + size])
+
+            self._stream.seek(self._begin + offset)
+            data = self._stream.read(size)
+
+        if len(data) != size:
+            raise ContainerFormatError("The container is truncated.")
+
+        return data
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    def plaintext_size(self) -> int:
+        return sum(entry[2] for entry in self._index)
+
+    def read_chunk(self, index: int, cipher: HKSCipher = None) -> bytes:
+        """Decrypt the chunk at index. The cipher (the one of the reader
+        by default) is reset, so a cipher MUST NOT be shared by threads."""
+        if not isinstance(index, int):
+            raise HTypeError("index", index, int)
+
+        if cipher is None:
+            cipher = self._cipher
+
+        offset, record_size, plaintext_size = self._index[index]
+        record = memoryview(self._read_raw(offset, record_size))
+
+        position = 0
+        for i in range(cipher._number_of_params):
+            param_size, = _PARAM_SIZE.unpack(record[position : position + _PARAM_SIZE.size])
+            position += _PARAM_SIZE.size
+            cipher.set_param(i, bytes(record[position : position + param_size]))
+            position += param_size
+
+        cipher.reset(False)
+        plaintext = cipher.decrypt(record[position:])
+        if len(plaintext) != _CHUNK_PREFIX.size + plaintext_size:
+            raise ContainerFormatError("The size of chunk {} does not match "
+            "the index.".format(index))
+
+        # The negative indices are normalized.
+        number = range(len(self._index))[index]
+        expected = (self._container_id, number, number == len(self._index) - 1)
+        if _CHUNK_PREFIX.unpack_from(plaintext) != expected:
+            raise ContainerFormatError("The chunk {} does not belong to this "
+            "position of the container.".format(index))
+
+        return plaintext[_CHUNK_PREFIX.size:]
+
+    def read_chunks(self, indices: Iterable[int], ciphers: Sequence[HKSCipher] = None) -> List[bytes]:
+        """Decrypt the chunks at indices. If many ciphers are given, the chunks
+        are decrypted in parallel, one thread per cipher."""
+        indices = list(indices)
+        if not ciphers:
+            return [self.read_chunk(index) for index in indices]
+
+        for cipher in ciphers:
+            if type(cipher) is not type(self._cipher):
+                raise HTypeError("ciphers", cipher, type(self._cipher))
+
+        groups = [indices[i::len(ciphers)] for i in range(len(ciphers))]
+
+        def read_group(group_id: int) -> List[bytes]:
+            return [self.read_chunk(index, ciphers[group_id]) for index in groups[group_id]]
+
+        with ThreadPoolExecutor(len(ciphers)) as executor:
+            results = list(executor.map(read_group, range(len(ciphers))))
+
+        plaintexts = [None] * len(indices)
+        for group_id, result in enumerate(results):
+            plaintexts[group_id::len(ciphers)] = result
+
+        return plaintexts
+
+    def read(self, buffer_size: int = 1024) -> bytes:
+        output = bytearray()
+        while len(output) < buffer_size:
+            if not self._pending:
+                if self._next_chunk >= len(self._index):
+                    break
+
+                self._pending = memoryview(self.read_chunk(self._next_chunk))
+                self._next_chunk += 1
+
+            data = self._pending[:buffer_size - len(output)]
+            output += data
+            self._pending = self._pending[len(data):]
+
+        return bytes(output)
+
+    def reset(self) -> None:
+        self._next_chunk = 0
+        self._pending = memoryview(b"")
@@ -1,6 +1,7 @@
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.backends import default_backend
 from hkserror.hkserror import HTypeError
+from hks_pylib.utils import BytesLike, is_bytes_like
 
 
 class HKSHash(object):
@@ -8,10 +9,10 @@ class HKSHash(object):
     def __init__(self, **kwargs) -> None:
         super().__init__()
 
-    def update(self, msg: bytes) -> None:
+    def update(self, msg: BytesLike) -> None:
         raise NotImplementedError()
 
-    def finalize(self, msg: bytes = None) -> bytes:
+    def finalize(self, msg: BytesLike = None) -> bytes:
         raise NotImplementedError()
 
     def reset(self) -> None:
@@ -30,15 +31,15 @@ class BuiltinHash(HKSHash):
         self._algorithm = algorithm
         self._digest = hashes.Hash(self._algorithm, default_backend())
     
-    def update(self, msg: bytes):
-        if not isinstance(msg, bytes):
-            raise HTypeError("msg", msg, bytes)
+    def update(self, msg: BytesLike):
+        if not is_bytes_like(msg):
+            raise HTypeError("msg", msg, "bytes-like object")
 
         self._digest.update(msg)
    
-    def finalize(self, msg: bytes = None) -> bytes:
-        if msg is not None and not isinstance(msg, bytes):
-            raise HTypeError("msg", msg, bytes, None)
+    def finalize(self, msg: BytesLike = None) -> bytes:
+        if msg is not None and not is_bytes_like(msg):
+            raise HTypeError("msg", msg, "bytes-like object", None)
 
         if msg is not None:
             self.update(msg)
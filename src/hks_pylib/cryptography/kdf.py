@@ -0,0 +1,71 @@
+from typing import Dict, Iterable, Tuple, Union
+
+from cryptography.hazmat.primitives import hashes, hmac
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.kdf.hkdf import HKDFExpand
+
+from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+
+from hks_pylib.utils import BytesLike, is_bytes_like
+
+
+Label = Union[str, bytes]
+
+
+def hkdf_extract(
+            material: BytesLike,
+            salt: bytes = None,
+            algorithm: hashes.HashAlgorithm = None
+        ) -> bytes:
+    "The HKDF-Extract step (RFC 5869), return the pseudorandom key."
+    if not is_bytes_like(material):
+        raise HTypeError("material", material, "bytes-like object")
+
+    if salt is not None and not isinstance(salt, bytes):
+        raise HTypeError("salt", salt, bytes, None)
+
+    algorithm = algorithm or hashes.SHA256()
+    if not salt:
+        salt = b"\x00" * algorithm.digest_size
+
+    h = hmac.HMAC(salt, algorithm, default_backend())
+    h.update(bytes(material))
+    return h.finalize()
+
+
+def derive_keys(
+            material: BytesLike,
+            labels: Iterable[Tuple[Label, int]],
+            salt: bytes = None,
+            algorithm: hashes.HashAlgorithm = None
+        ) -> Dict[Label, bytes]:
+    """Derive many keys from the same material by HKDF: the material is
+    extracted once, then each (label, size) is expanded with the label as
+    its info. Return a dict of label -> key of size bytes.\n
+    derive_keys(material, [(label, size)])[label] is the same as the
+    one-shot HKDF(algorithm, size, salt, info=label).derive(material)."""
+    algorithm = algorithm or hashes.SHA256()
+    labels = list(labels)
+
+    infos = []
+    for label, size in labels:
+        if not isinstance(label, (str, bytes)):
+            raise HTypeError("label", label, str, bytes)
+
+        if not isinstance(size, int):
+            raise HTypeError("size", size, int)
+
+        infos.append(label.encode() if isinstance(label, str) else label)
+
+    # "a" and b"a" are the same info, so they would derive the same key.
+    if len(set(infos)) != len(infos):
+        raise HFormatError("Parameter labels expected distinct labels.")
+
+    prk = hkdf_extract(material, salt, algorithm)
+
+    keys = {}
+    for (label, size), info in zip(labels, infos):
+        keys[label] = HKDFExpand(algorithm, size, info, default_backend()).derive(prk)
+
+    return keys
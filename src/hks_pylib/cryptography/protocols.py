@@ -1,52 +1,238 @@
-from cryptography.hazmat.primitives import hashes
+import threading
+from collections import deque
+from typing import Dict, Iterable, Tuple, Union
+
 from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.kdf.hkdf import HKDF
-from cryptography.hazmat.primitives.asymmetric import dh
+from cryptography.hazmat.primitives.asymmetric import dh, x25519
 
 from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+from hks_pylib.hksenum import HKSEnum
+from hks_pylib.cryptography.kdf import Label, derive_keys
 from hks_pylib.errors.cryptography import ResetError
 
 
+class KeyExchangeMode(HKSEnum):
+    FFDH = "ffdh"
+    X25519 = "x25519"
+
+
+# The parameter objects are immutable, they are shared by all exchanges
+# of the process.
+_parameters_cache: Dict[Tuple[int, int], dh.DHParameters] = {}
+_parameters_lock = threading.Lock()
+
+
+def _get_parameters(p: int, g: int) -> dh.DHParameters:
+    with _parameters_lock:
+        parameters = _parameters_cache.get((p, g))
+        if parameters is None:
+            parameters = dh.DHParameterNumbers(p, g).parameters(default_backend())
+            _parameters_cache[(p, g)] = parameters
+
+        return parameters
+
+
+def _check_exchange_params(p: int, g: int, mode: KeyExchangeMode) -> dh.DHParameters:
+    "Return the (cached) parameters of FFDH, or None in the X25519 mode."
+    if p is not None and not isinstance(p, int):
+        raise HTypeError("p", p, int, None)
+
+    if g is not None and not isinstance(g, int):
+        raise HTypeError("g", g, int, None)
+
+    if not isinstance(mode, KeyExchangeMode):
+        raise HTypeError("mode", mode, KeyExchangeMode)
+
+    if mode is KeyExchangeMode.X25519:
+        if p or g:
+            raise HFormatError("The X25519 mode does not use p and g parameters.")
+
+        return None
+
+    if not p:
+        p = DiffieHellmanExchange.DEFAULT_P
+    if not g:
+        g = DiffieHellmanExchange.DEFAULT_G
+
+    return _get_parameters(p, g)
+
+
+def _generate_private_key(mode: KeyExchangeMode, parameters: dh.DHParameters):
+    if mode is KeyExchangeMode.X25519:
+        return x25519.X25519PrivateKey.generate()
+
+    return parameters.generate_private_key()
+
+
+class EphemeralKeyPool(object):
+    """Keep up to high_water pre-generated private keys of an exchange mode
+    (and p, g in the FFDH mode), which are generated by a background thread
+    (OpenSSL releases the GIL). Pass it to DiffieHellmanExchange as key_pool,
+    so a handshake pops a ready key instead of generating one. If the pool
+    is empty, take() generates a key inline.\n
+    The pool should be closed by close() (or a with statement)."""
+    def __init__(self,
+                p: int = None,
+                g: int = None,
+                mode: KeyExchangeMode = KeyExchangeMode.FFDH,
+                high_water: int = 32
+            ) -> None:
+        if not isinstance(high_water, int):
+            raise HTypeError("high_water", high_water, int)
+
+        if high_water <= 0:
+            raise HFormatError("Parameter high_water expected a positive integer.")
+
+        self._mode = mode
+        self._parameters = _check_exchange_params(p, g, mode)
+        self._high_water = high_water
+
+        self._condition = threading.Condition()
+        self._keys = deque()
+        self._closed = False
+
+        self._hits = 0
+        self._misses = 0
+
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    @property
+    def mode(self) -> KeyExchangeMode:
+        return self._mode
+
+    def _fill(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closed or len(self._keys) < self._high_water)
+
+                if self._closed:
+                    return
+
+            private_key = _generate_private_key(self._mode, self._parameters)
+
+            with self._condition:
+                if self._closed:
+                    return
+
+                self._keys.append(private_key)
+
+    def take(self):
+        "Return a private key, which MUST be used for only one exchange."
+        with self._condition:
+            if self._keys:
+                self._hits += 1
+                private_key = self._keys.popleft()
+                self._condition.notify_all()
+                return private_key
+
+            self._misses += 1
+
+        return _generate_private_key(self._mode, self._parameters)
+
+    @property
+    def available(self) -> int:
+        with self._condition:
+            return len(self._keys)
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def close(self) -> None:
+        "Stop the background thread and drop the ready keys."
+        with self._condition:
+            self._closed = True
+            self._keys.clear()
+            self._condition.notify_all()
+
+        self._thread.join()
+
+    def __enter__(self) -> "EphemeralKeyPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
 class DiffieHellmanExchange(object):
+    """A Diffie-Hellman key exchange in the finite field (FFDH, with the
+    p and g parameters) or on Curve25519 (X25519). Each exchange uses a new
+    private key, which is generated when the public key is first needed."""
     DEFAULT_P = 0xFFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7EDEE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3BE39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA051015728E5A8AACAA68FFFFFFFFFFFFFFFF
     DEFAULT_G = 2
 
-    def __init__(self, p: int = None, g: int = None) -> None:
-        if p is not None and not isinstance(p, int):
-            raise HTypeError("p", p, int, None)
-        
-        if g is not None and not isinstance(g, int):
-            raise HTypeError("g", g, int, None)
+    def __init__(self,
+                p: int = None,
+                g: int = None,
+                mode: KeyExchangeMode = KeyExchangeMode.FFDH,
+                key_pool: EphemeralKeyPool = None
+            ) -> None:
+        if key_pool is not None and not isinstance(key_pool, EphemeralKeyPool):
+            raise HTypeError("key_pool", key_pool, EphemeralKeyPool, None)
 
-        if not p:
-            p = DiffieHellmanExchange.DEFAULT_P
-        if not g:
-            g = DiffieHellmanExchange.DEFAULT_G
+        self._mode = mode
+        self._parameters = _check_exchange_params(p, g, mode)
 
-        params_numbers = dh.DHParameterNumbers(p, g)
-        self._parameters = params_numbers.parameters(default_backend())
-        self.__private_key = self._parameters.generate_private_key()
+        if key_pool is not None and \
+                (key_pool.mode is not mode or key_pool._parameters is not self._parameters):
+            raise HFormatError("The key_pool expected the same mode, p and g as the exchange.")
+
+        self._key_pool = key_pool
+        self.__private_key = None
+        self._exchanged = False
+
+    @property
+    def mode(self) -> KeyExchangeMode:
+        return self._mode
+
+    def _generate_private_key(self):
+        if self._key_pool is not None:
+            return self._key_pool.take()
+
+        return _generate_private_key(self._mode, self._parameters)
+
+    def _private_key(self):
+        if self.__private_key is None and not self._exchanged:
+            self.__private_key = self._generate_private_key()
+
+        return self.__private_key
 
     @property
-    def public_key(self) -> dh.DHPublicKey:
-        if self.__private_key is None:
+    def public_key(self) -> Union[dh.DHPublicKey, x25519.X25519PublicKey]:
+        private_key = self._private_key()
+        if private_key is None:
             return None
 
-        return self.__private_key.public_key()
+        return private_key.public_key()
 
-    def exchange(self, public_key: dh.DHPublicKey) -> bytes:
-        if not isinstance(public_key, dh.DHPublicKey):
+    def exchange(self, public_key: Union[dh.DHPublicKey, x25519.X25519PublicKey]) -> bytes:
+        if self._mode is KeyExchangeMode.X25519:
+            if not isinstance(public_key, x25519.X25519PublicKey):
+                raise HTypeError("public_key", public_key, x25519.X25519PublicKey)
+        elif not isinstance(public_key, dh.DHPublicKey):
             raise HTypeError("public_key", public_key, dh.DHPublicKey)
 
-        if self.__private_key is None:
+        private_key = self._private_key()
+        if private_key is None:
             raise ResetError("The reset() must be called before calling exchange().")
 
-        common_key = self.__private_key.exchange(public_key)
+        common_key = private_key.exchange(public_key)
         self.__private_key = None
+        self._exchanged = True
         return common_key
 
     def reset(self):
-        self.__private_key = self._parameters.generate_private_key()
+        self.__private_key = None
+        self._exchanged = False
+
+    HANDSHAKE_INFO = b"handshake data"
 
     @staticmethod
     def derive_key(shared_key: bytes, key_size: int) -> bytes:
@@ -56,9 +242,15 @@ class DiffieHellmanExchange(object):
         if not isinstance(key_size, int):
             raise HTypeError("key_size", key_size, int)
 
-        return HKDF(
-            algorithm=hashes.SHA256(),
-            length=key_size,
-            salt=None,
-            info=b'handshake data',
-        ).derive(shared_key)
+        return derive_keys(shared_key, [(DiffieHellmanExchange.HANDSHAKE_INFO, key_size)]) \
+            [DiffieHellmanExchange.HANDSHAKE_INFO]
+
+    @staticmethod
+    def derive_keys(shared_key: bytes, labels: Iterable[Tuple[Label, int]]) -> Dict[Label, bytes]:
+        """Derive many labeled keys (e.g. the encryption and MAC keys of each
+        direction) from the shared key with one HKDF extract step.
+        See hks_pylib.cryptography.kdf.derive_keys()."""
+        if not isinstance(shared_key, bytes):
+            raise HTypeError("shared_key", shared_key, bytes)
+
+        return derive_keys(shared_key, labels)
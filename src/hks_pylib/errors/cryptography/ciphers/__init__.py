@@ -15,3 +15,7 @@ class CipherParameterError(CipherError):
 
 class FinalizeCipherError(CipherError):
     "The exception is raised when you has call reset() without calling finalize() yet."
+
+
+class BufferIsTooSmallError(CipherError):
+    "The exception is raised when an output buffer cannot hold the result of a cipher."
@@ -0,0 +1,5 @@
+from hks_pylib.errors.cryptography.ciphers import CipherError
+
+
+class CompressionError(CipherError):
+    "The exception is raised when the CompressingCipher fails to (de)compress the data."
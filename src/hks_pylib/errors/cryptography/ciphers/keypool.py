@@ -0,0 +1,5 @@
+from hks_pylib.errors.cryptography.ciphers import CipherError
+
+
+class KeyPoolError(CipherError):
+    "The exception is raised when the RSAKeyPool fails to provide a key."
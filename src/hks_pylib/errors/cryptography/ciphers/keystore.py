@@ -0,0 +1,13 @@
+from hks_pylib.errors.cryptography.ciphers import CipherError
+
+
+class KeyStoreError(CipherError):
+    "The exception is raised by failures in the keystore module."
+
+
+class KeyStoreFormatError(KeyStoreError):
+    "The exception is raised when the keystore file is corrupted."
+
+
+class NotExistKeyError(KeyStoreError):
+    "The exception is raised when the keystore does not have the requested key."
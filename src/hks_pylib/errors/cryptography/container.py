@@ -0,0 +1,9 @@
+from hks_pylib.errors.cryptography import CryptographyError
+
+
+class ContainerError(CryptographyError):
+    "The exception is raised by failures in container module."
+
+
+class ContainerFormatError(ContainerError):
+    "The exception is raised when reading an invalid or corrupted container."
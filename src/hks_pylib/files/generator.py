@@ -19,10 +19,8 @@ class BytesGenerator(object):
             self._beigin_position = self._stream.tell()
 
         if isinstance(io, (bytes, bytearray)):
-            self._stream = io.copy()
+            self._stream = bytearray(io)
             self._index = 0
-            if isinstance(io, bytes):
-                self._stream = bytearray(self._stream)
 
         if isinstance(io, IO.BufferedIOBase):
             self._stream = io
@@ -42,7 +40,7 @@ class BytesGenerator(object):
             return self._stream.read(buffer_size)
 
         elif isinstance(self._stream, bytearray):
-            value = self._stream[self._index : buffer_size]
+            value = self._stream[self._index : self._index + buffer_size]
             self._index += buffer_size
             return value
 
@@ -1,4 +1,20 @@
-from typing import Any, Type
+from typing import Any, Type, Union
+
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def is_bytes_like(obj: Any) -> bool:
+    """Return True if obj is a C-contiguous buffer of single bytes (bytes,
+    bytearray, memoryview, mmap, ...). Buffers of larger items (e.g.
+    array('I')) and strided views are rejected, because their len()
+    does not count bytes."""
+    try:
+        view = memoryview(obj)
+    except TypeError:
+        return False
+
+    return view.c_contiguous and view.itemsize == 1 and view.format in ("B", "b", "c")
 
 
 class AsObject():
@@ -1,5 +1,7 @@
 import os
-from hks_pylib.cryptography.ciphers.asymmetrics import RSACipher, RSAKey
+import pytest
+from hks_pylib.cryptography.ciphers.asymmetrics import RSACipher, RSAKey, X25519Key, _KeyCache
+from hks_pylib.errors.cryptography.ciphers import KeyError
 
 
 def run_RSA():
@@ -28,4 +30,66 @@ def run_RSA():
     assert m == all_msg
 
 def test_RSA(benchmark):
-    benchmark.pedantic(run_RSA, rounds=5)
\ No newline at end of file
+    benchmark.pedantic(run_RSA, rounds=5)
+
+def test_RSA_bytes_like():
+    rsakey = RSAKey()
+    rsakey.generate(1024)
+    cipher = RSACipher(rsakey)
+
+    plaintext = os.urandom(500)
+    ciphertext = cipher.encrypt(memoryview(plaintext)[:200], finalize=False)
+    ciphertext += cipher.encrypt(bytearray(plaintext[200:]))
+
+    cipher.reset()
+    assert cipher.decrypt(memoryview(ciphertext)) == plaintext
+
+def test_RSA_chunks():
+    rsakey = RSAKey()
+    rsakey.generate(1024)
+    cipher = RSACipher(rsakey)
+
+    # 62 = 128 - 2 * 32 - 2 bytes of plaintext per chunk.
+    for size in (0, 61, 62, 63, 62 * 10, 62 * 10 + 1, 100000):
+        plaintext = os.urandom(size)
+        cipher.reset()
+        ciphertext = cipher.encrypt(plaintext[:size // 3], finalize=False)
+        ciphertext += cipher.encrypt(plaintext[size // 3:])
+        assert len(ciphertext) == 128 * max(1, (size + 61) // 62)
+
+        cipher.reset()
+        plaintext_parts = [cipher.decrypt(ciphertext[:1000], finalize=False)]
+        plaintext_parts.append(cipher.decrypt(ciphertext[1000:]))
+        assert b"".join(plaintext_parts) == plaintext
+
+def test_RSA_save_all(tmp_path):
+    rsakey = RSAKey()
+    rsakey.generate(1024)
+    rsakey.save_all(str(tmp_path / "keys"), b"password")
+
+    loaded = RSAKey()
+    loaded.load_all(str(tmp_path / "keys"), b"password")
+    assert loaded.private_key().private_numbers() == rsakey.private_key().private_numbers()
+    assert loaded.public_key().public_numbers() == rsakey.public_key().public_numbers()
+
+    # The second load is served by the cache of deserialized keys.
+    again = RSAKey()
+    again.load_all(str(tmp_path / "keys"), b"password")
+    assert again.private_key() is loaded.private_key()
+
+    # The keys loaded without cache are not added to the cache.
+    data = rsakey.serialize_private_key()
+    uncached = RSAKey()
+    uncached.deserialize_private_key(data, cache=False)
+    assert uncached.private_key().private_numbers() == rsakey.private_key().private_numbers()
+    assert RSAKey._cache.get(_KeyCache.fingerprint(b"private", data, None)) is None
+
+    with pytest.raises(ValueError):
+        RSAKey().load_all(str(tmp_path / "keys"), b"wrong password")
+
+def test_key_types():
+    rsakey = RSAKey()
+    rsakey.generate(1024)
+
+    with pytest.raises(KeyError):
+        X25519Key().deserialize_public_key(rsakey.serialize_public_key())
@@ -0,0 +1,83 @@
+import os
+import asyncio
+import threading
+
+from hks_pylib.cryptography.ciphers.asynccipher import AsyncCipher
+from hks_pylib.cryptography.ciphers.symmetrics import AES_CTR, AES_CBC, HybridCipher
+from hks_pylib.cryptography.ciphers.asymmetrics import RSAKey, RSACipher
+
+
+AES_KEY = b"0123456789abcdeffedcba9876543210"
+
+
+class ThreadRecorder(AES_CTR):
+    def __init__(self, key: bytes):
+        super().__init__(key)
+        self.threads = []
+
+    def encrypt(self, plaintext, finalize=True):
+        self.threads.append(threading.get_ident())
+        return super().encrypt(plaintext, finalize)
+
+
+def test_async_cipher():
+    async def run():
+        cipher = AsyncCipher(HybridCipher(AES_CBC(AES_KEY)), offload_size=1000)
+        cipher.reset()
+
+        chunks = [os.urandom(size) for size in (10, 5000, 999, 1000, 0)]
+        ciphertext = b""
+        for chunk in chunks:
+            ciphertext += await cipher.encrypt(chunk, finalize=False)
+        ciphertext += await cipher.finalize()
+
+        cipher.reset(False)
+        assert await cipher.decrypt(ciphertext) == b"".join(chunks)
+
+    asyncio.run(run())
+
+
+def test_async_cipher_offload():
+    async def run():
+        recorder = ThreadRecorder(AES_KEY)
+        cipher = AsyncCipher(recorder, offload_size=100)
+        cipher.reset()
+
+        await cipher.encrypt(os.urandom(10), finalize=False)
+        await cipher.encrypt(os.urandom(1000))
+        return recorder.threads
+
+    small, large = asyncio.run(run())
+    assert small == threading.get_ident()
+    assert large != threading.get_ident()
+
+
+def test_async_cipher_concurrent():
+    async def run():
+        cipher = AsyncCipher(AES_CTR(AES_KEY), offload_size=0)
+        cipher.reset()
+
+        plaintext = os.urandom(10000)
+        chunks = [plaintext[i : i + 1000] for i in range(0, len(plaintext), 1000)]
+        # The calls are serialized in the order of their creation.
+        results = await asyncio.gather(*[cipher.encrypt(chunk, False) for chunk in chunks])
+        ciphertext = b"".join(results) + await cipher.finalize()
+
+        cipher.reset(False)
+        assert await cipher.decrypt(ciphertext) == plaintext
+
+    asyncio.run(run())
+
+
+def test_async_rsa_cipher():
+    async def run():
+        rsakey = RSAKey()
+        rsakey.generate(1024)
+        cipher = AsyncCipher(RSACipher(rsakey), offload_size=0)
+
+        plaintext = os.urandom(1000)
+        ciphertext = await cipher.encrypt(plaintext)
+        cipher.reset()
+        assert await cipher.decrypt(ciphertext) == plaintext
+
+    asyncio.run(run())
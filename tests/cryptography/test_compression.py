@@ -0,0 +1,63 @@
+import os
+import pytest
+
+from hks_pylib.cryptography.ciphers.compression import Compression, CompressingCipher
+from hks_pylib.cryptography.ciphers.symmetrics import AES_CTR, AES_CBC, HybridCipher, NoCipher
+from hks_pylib.errors.cryptography.ciphers.compression import CompressionError
+
+
+AES_KEY = b"0123456789abcdeffedcba9876543210"
+
+
+@pytest.mark.parametrize('algorithm', [Compression.ZLIB, Compression.LZMA])
+@pytest.mark.parametrize('inner', [AES_CTR, AES_CBC, lambda key: HybridCipher(AES_CBC(key))])
+def test_compressing_cipher(algorithm, inner):
+    plaintext = b"huykingsofm " * 10000 + os.urandom(1000)
+    cipher = CompressingCipher(inner(AES_KEY), algorithm, level=6)
+    cipher.reset()
+
+    ciphertext = b""
+    for i in range(0, len(plaintext), 7000):
+        ciphertext += cipher.encrypt(plaintext[i : i + 7000], finalize=False)
+    ciphertext += cipher.finalize()
+    assert len(ciphertext) < len(plaintext) // 10
+
+    cipher.reset(False)
+    computed_plaintext = b""
+    for i in range(0, len(ciphertext), 100):
+        computed_plaintext += cipher.decrypt(ciphertext[i : i + 100], finalize=False)
+    computed_plaintext += cipher.finalize()
+    assert computed_plaintext == plaintext
+
+
+def test_compressing_cipher_truncated():
+    cipher = CompressingCipher(NoCipher())
+    ciphertext = cipher.encrypt(os.urandom(1000))
+
+    cipher.reset()
+    with pytest.raises(CompressionError):
+        cipher.decrypt(ciphertext[:-10])
+
+
+@pytest.mark.parametrize('algorithm', [Compression.ZLIB, Compression.LZMA])
+def test_compressing_cipher_trailing_data(algorithm):
+    cipher = CompressingCipher(NoCipher(), algorithm)
+    ciphertext = cipher.encrypt(os.urandom(1000))
+
+    cipher.reset()
+    with pytest.raises(CompressionError):
+        cipher.decrypt(ciphertext + b"JUNK")
+
+
+@pytest.mark.parametrize('algorithm', [Compression.ZLIB, Compression.LZMA])
+def test_compressing_cipher_max_size(algorithm):
+    cipher = CompressingCipher(NoCipher(), algorithm, max_size=100000)
+    ciphertext = cipher.encrypt(b"\x00" * 100000)
+
+    cipher.reset()
+    assert cipher.decrypt(ciphertext) == b"\x00" * 100000
+
+    bomb = CompressingCipher(NoCipher(), algorithm).encrypt(b"\x00" * 10000000)
+    cipher.reset()
+    with pytest.raises(CompressionError):
+        cipher.decrypt(bomb)
@@ -0,0 +1,110 @@
+import io
+import os
+import struct
+import pytest
+
+from hks_pylib.files.generator import BytesGenerator
+from hks_pylib.cryptography.container import ContainerReader, ContainerWriter
+from hks_pylib.cryptography.ciphers.symmetrics import AES_CTR, AES_CBC, AES_GCM, NoCipher
+from hks_pylib.errors.cryptography.container import ContainerError, ContainerFormatError
+
+
+AES_KEY = b"0123456789abcdeffedcba9876543210"
+
+
+@pytest.mark.parametrize('cipher_cls', [AES_CTR, AES_CBC, AES_GCM])
+def test_container(cipher_cls, tmp_path):
+    plaintext = os.urandom(10000)
+    path = str(tmp_path / "container")
+
+    with ContainerWriter(cipher_cls(AES_KEY), path, chunk_size=1000) as writer:
+        writer.write(plaintext[:10])
+        writer.write(plaintext[10:2500])
+        writer.write_from(BytesGenerator(plaintext[2500:]))
+
+    reader = ContainerReader(cipher_cls(AES_KEY), path)
+    assert len(reader) == 10
+    assert reader.plaintext_size() == len(plaintext)
+    assert reader.read_chunk(7) == plaintext[7000:8000]
+    assert reader.read_chunk(0) == plaintext[:1000]
+
+    assert b"".join(reader.iter(777)) == plaintext
+    reader.reset()
+    assert reader.read(1500) == plaintext[:1500]
+
+    ciphers = [cipher_cls(AES_KEY) for _ in range(3)]
+    chunks = reader.read_chunks([9, 1, 4, 5, 2], ciphers)
+    assert chunks == [plaintext[i * 1000 : (i + 1) * 1000] for i in [9, 1, 4, 5, 2]]
+    reader.close()
+
+
+def test_container_stream():
+    stream = io.BytesIO()
+    writer = ContainerWriter(AES_CTR(AES_KEY), stream, chunk_size=100)
+    writer.write(b"huykingsofm" * 50)
+    writer.close()
+
+    container = stream.getvalue()
+    reader = ContainerReader(AES_CTR(AES_KEY), container)
+    assert reader.read(10000) == b"huykingsofm" * 50
+    assert reader.read(10000) == b""
+
+    with pytest.raises(ContainerError):
+        ContainerReader(NoCipher(), container)
+
+    with pytest.raises(ContainerFormatError):
+        ContainerReader(AES_CTR(AES_KEY), container[:-1])
+
+
+def test_empty_container():
+    stream = io.BytesIO()
+    ContainerWriter(AES_CBC(AES_KEY), stream).close()
+
+    # The empty last chunk is written.
+    reader = ContainerReader(AES_CBC(AES_KEY), io.BytesIO(stream.getvalue()))
+    assert len(reader) == 1
+    assert reader.read() == b""
+
+
+def test_container_tampered():
+    stream = io.BytesIO()
+    with ContainerWriter(AES_GCM(AES_KEY), stream, chunk_size=100) as writer:
+        writer.write(os.urandom(300))
+
+    container = stream.getvalue()
+    nchunks, index_offset, magic = struct.unpack(">QQ4s", container[-20:])
+    entries = [container[index_offset + i * 24 : index_offset + (i + 1) * 24] for i in range(nchunks)]
+
+    # Swap the index entries of the chunks 0 and 1.
+    swapped = container[:index_offset] + entries[1] + entries[0] + b"".join(entries[2:]) + container[-20:]
+    reader = ContainerReader(AES_GCM(AES_KEY), swapped)
+    with pytest.raises(ContainerFormatError):
+        reader.read_chunk(0)
+
+    # Drop the last chunk and rewrite the trailer.
+    truncated = container[:index_offset] + b"".join(entries[:-1]) \
+        + struct.pack(">QQ4s", nchunks - 1, index_offset, magic)
+    reader = ContainerReader(AES_GCM(AES_KEY), truncated)
+    with pytest.raises(ContainerFormatError):
+        reader.read_chunk(nchunks - 2)
+
+    # Strip all chunks.
+    stripped = container[:index_offset] + struct.pack(">QQ4s", 0, index_offset, magic)
+    with pytest.raises(ContainerFormatError):
+        ContainerReader(AES_GCM(AES_KEY), stripped)
+
+
+def test_container_aborted():
+    def source():
+        yield os.urandom(250)
+        raise RuntimeError()
+
+    stream = io.BytesIO()
+    with pytest.raises(RuntimeError):
+        with ContainerWriter(AES_GCM(AES_KEY), stream, chunk_size=100) as writer:
+            for data in source():
+                writer.write(data)
+
+    # The partial data is not committed as a complete container.
+    with pytest.raises(ContainerFormatError):
+        ContainerReader(AES_GCM(AES_KEY), stream.getvalue())
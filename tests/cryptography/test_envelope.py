@@ -0,0 +1,91 @@
+import os
+import pytest
+
+from hks_pylib.cryptography.ciphers.cipherid import CipherID
+from hks_pylib.cryptography.ciphers.asymmetrics import RSAKey, X25519Key
+from hks_pylib.cryptography.ciphers.envelope import RSAEnvelopeCipher, X25519Cipher
+from hks_pylib.cryptography.ciphers.symmetrics import AES_CTR, AES_GCM, ChaCha20_Poly1305
+from hks_pylib.errors.cryptography.ciphers.asymmetrics import AsymmetricError
+from hks_pylib.errors.cryptography.ciphers.symmetrics import UnAuthenticatedPacketError
+
+
+owner_rsakey = RSAKey()
+owner_rsakey.generate(2048)
+
+other_rsakey = RSAKey()
+other_rsakey.deserialize_public_key(owner_rsakey.serialize_public_key())
+
+
+@pytest.mark.parametrize('payload_cipher', [AES_CTR, AES_GCM, ChaCha20_Poly1305])
+def test_envelope(payload_cipher):
+    sender = RSAEnvelopeCipher(other_rsakey, payload_cipher)
+    receiver = RSAEnvelopeCipher(owner_rsakey, payload_cipher)
+
+    plaintext = os.urandom(100000)
+    sender.reset()
+    ciphertext = sender.encrypt(plaintext[:1000], finalize=False)
+    ciphertext += sender.encrypt(plaintext[1000:])
+    assert sender.header_size == 256
+
+    receiver.reset()
+    received = b""
+    for i in range(0, len(ciphertext), 100):
+        received += receiver.decrypt(ciphertext[i : i + 100], finalize=False)
+    received += receiver.finalize()
+    assert received == plaintext
+
+    # A new payload key is used in each process.
+    sender.reset()
+    assert sender.encrypt(plaintext) != ciphertext
+
+    assert CipherID.hash2cls(CipherID.cls2hash(RSAEnvelopeCipher)) is RSAEnvelopeCipher
+
+
+def test_envelope_errors():
+    sender = RSAEnvelopeCipher(other_rsakey)
+    receiver = RSAEnvelopeCipher(owner_rsakey)
+
+    ciphertext = bytearray(sender.encrypt(b"huykingsofm"))
+    ciphertext[-1] ^= 1
+    with pytest.raises(UnAuthenticatedPacketError):
+        receiver.decrypt(ciphertext)
+
+    receiver.reset()
+    with pytest.raises(AsymmetricError):
+        receiver.decrypt(ciphertext[:100])
+
+    receiver.reset()
+    ciphertext[0] ^= 1
+    with pytest.raises(AsymmetricError):
+        receiver.decrypt(ciphertext)
+
+
+@pytest.mark.parametrize('payload_cipher', [AES_GCM, ChaCha20_Poly1305])
+def test_x25519(payload_cipher, tmp_path):
+    owner_key = X25519Key()
+    owner_key.generate()
+    owner_key.save_all(str(tmp_path), b"password")
+
+    other_key = X25519Key()
+    other_key.load_public_key(str(tmp_path / "public_key.pem"))
+    loaded_key = X25519Key()
+    loaded_key.load_all(str(tmp_path), b"password")
+
+    sender = X25519Cipher(other_key, payload_cipher)
+    receiver = X25519Cipher(loaded_key, payload_cipher)
+
+    plaintext = os.urandom(10000)
+    ciphertext = sender.encrypt(plaintext[:10], finalize=False) + sender.encrypt(plaintext[10:])
+    assert len(ciphertext) == 32 + len(plaintext) + 16
+
+    assert receiver.decrypt(ciphertext[:20], finalize=False) + receiver.decrypt(ciphertext[20:]) == plaintext
+
+    sender.reset()
+    receiver.reset()
+    ciphertext = bytearray(sender.encrypt(plaintext))
+    ciphertext[40] ^= 1
+    with pytest.raises(UnAuthenticatedPacketError):
+        receiver.decrypt(ciphertext)
+
+    with pytest.raises(AsymmetricError):
+        X25519Cipher(owner_key).decrypt(bytes(32) + bytes(ciphertext[32:]))
@@ -0,0 +1,109 @@
+import os
+import time
+import pytest
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from hkserror.hkserror import HFormatError
+
+from hks_pylib.cryptography.kdf import derive_keys
+from hks_pylib.cryptography.ciphers.keygenerator import KDF, KeyGenerator
+from hks_pylib.cryptography.protocols import DiffieHellmanExchange, KeyExchangeMode
+
+
+def test_derive_keys():
+    material = os.urandom(32)
+    labels = [("client key", 32), ("server key", 32), (b"client iv", 16), (b"mac", 100)]
+    keys = derive_keys(material, labels, salt=b"salt")
+
+    assert set(keys) == {label for label, _ in labels}
+    for label, size in labels:
+        info = label.encode() if isinstance(label, str) else label
+        expected = HKDF(hashes.SHA256(), size, b"salt", info).derive(material)
+        assert keys[label] == expected
+
+    with pytest.raises(HFormatError):
+        derive_keys(material, [("a", 16), ("a", 32)])
+
+    with pytest.raises(HFormatError):
+        derive_keys(material, [("a", 16), (b"a", 16)])
+
+
+def test_exchange_derive_keys():
+    P1 = DiffieHellmanExchange(mode=KeyExchangeMode.X25519)
+    P2 = DiffieHellmanExchange(mode=KeyExchangeMode.X25519)
+    pk1, pk2 = P1.public_key, P2.public_key
+    shared_key = P1.exchange(pk2)
+    assert shared_key == P2.exchange(pk1)
+
+    keys = P1.derive_keys(shared_key, [(b"handshake data", 32), ("mac", 32)])
+    assert keys[b"handshake data"] == P2.derive_key(shared_key, 32)
+
+
+def test_pwd2keys():
+    generator = KeyGenerator(32)
+    keys = generator.pwd2keys("huykingsofm", [(b"handshake data", 32), ("iv", 16)])
+    assert keys[b"handshake data"] == generator.pwd2key("huykingsofm")
+    assert len(keys["iv"]) == 16
+
+
+@pytest.mark.parametrize('kdf', [KDF.HKDF, KDF.PBKDF2, KDF.SCRYPT])
+def test_key_generator_kdf(kdf):
+    generator = KeyGenerator(32, kdf=kdf, iterations=1000, n=2 ** 10)
+    key = generator.pwd2key("huykingsofm", b"salt")
+    assert len(key) == 32
+    assert key == KeyGenerator(32, kdf=kdf, iterations=1000, n=2 ** 10).pwd2key("huykingsofm", b"salt")
+    assert key != generator.pwd2key("huykingsofm", b"other salt")
+
+    keys = generator.pwd2keys("huykingsofm", [("enc", 32), ("mac", 32)], b"salt")
+    assert keys["enc"] != keys["mac"]
+
+    if kdf is not KDF.HKDF:
+        with pytest.raises(TypeError):
+            generator.pwd2key("huykingsofm")
+
+        with pytest.raises(TypeError):
+            generator.pwd2keys("huykingsofm", [("enc", 32)])
+
+
+def test_key_generator_cache(monkeypatch):
+    generator = KeyGenerator(32, kdf=KDF.PBKDF2, iterations=1000, cache_size=2, ttl=60)
+    calls = []
+    derive = generator._derive
+    monkeypatch.setattr(generator, "_derive", lambda *args: calls.append(args) or derive(*args))
+
+    key = generator.pwd2key("password", b"salt")
+    assert generator.pwd2key("password", b"salt") == key
+    assert len(calls) == 1
+
+    generator.pwd2key("password", b"salt 2")
+    generator.pwd2key("password", b"salt 3")
+    assert len(generator._cache) == 2
+
+    # The least recently used key was evicted.
+    assert generator.pwd2key("password", b"salt") == key
+    assert len(calls) == 4
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert len(generator._cache) == 0
+    generator.pwd2key("password", b"salt")
+    assert len(calls) == 5
+
+
+def test_key_generator_cache_expiry(monkeypatch):
+    generator = KeyGenerator(32, kdf=KDF.PBKDF2, iterations=1000, cache_size=4, ttl=60)
+    now = time.monotonic()
+
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    generator.pwd2key("password", b"salt")
+    monkeypatch.setattr(time, "monotonic", lambda: now + 30)
+    generator.pwd2key("password", b"salt 2")
+
+    # The oldest key is the most recently used one, it still expires first.
+    monkeypatch.setattr(time, "monotonic", lambda: now + 40)
+    generator.pwd2key("password", b"salt")
+    # A lookup of another key also evicts the expired keys.
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    generator.pwd2key("password", b"salt 2")
+    assert len(generator._cache._keys) == 1
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from hks_pylib.cryptography.ciphers.keypool import RSAKeyPool
+from hks_pylib.cryptography.ciphers.asymmetrics import RSACipher
+from hks_pylib.errors.cryptography.ciphers.keypool import KeyPoolError
+
+
+def test_rsa_key_pool():
+    with RSAKeyPool((1024, 2048), capacity=2, workers=2) as pool:
+        rsakey = pool.take(1024, timeout=60)
+        assert rsakey.key_size() == 1024
+
+        cipher = RSACipher(rsakey)
+        cipher.reset()
+        ciphertext = cipher.encrypt(b"huykingsofm")
+        cipher.reset()
+        assert cipher.decrypt(ciphertext) == b"huykingsofm"
+
+        rsakey = asyncio.run(pool.take_async(2048, timeout=60))
+        assert rsakey.key_size() == 2048
+
+        pool.take(2048, timeout=60)
+        pool.take(2048, timeout=60)
+
+    with pytest.raises(KeyPoolError):
+        pool.take(1024)
+
+
+def test_rsa_key_pool_refill():
+    executor = ThreadPoolExecutor(1)
+    pool = RSAKeyPool((1024,), capacity=3, executor=executor)
+    keys = [pool.take(timeout=60) for _ in range(5)]
+    assert len(set(id(key.private_key()) for key in keys)) == 5
+
+    executor.shutdown(wait=True)
+    assert pool.available(1024) == 3
+    pool.close()
+
+
+class _FailingExecutor(ThreadPoolExecutor):
+    def __init__(self, failures: int) -> None:
+        super().__init__(1)
+        self.failures = failures
+
+    def submit(self, fn, *args, **kwargs):
+        if self.failures > 0:
+            self.failures -= 1
+            fn = lambda *args: b"not a key"
+
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_rsa_key_pool_recover():
+    executor = _FailingExecutor(failures=1)
+    with RSAKeyPool((1024,), capacity=1, executor=executor) as pool:
+        with pytest.raises(KeyPoolError):
+            pool.take(timeout=60)
+
+        rsakey = pool.take(timeout=60)
+        assert rsakey.key_size() == 1024
+
+    executor.shutdown(wait=True)
+
+
+def test_rsa_key_pool_error_per_keysize():
+    executor = _FailingExecutor(failures=1)
+    with RSAKeyPool((1024, 2048), capacity=1, executor=executor) as pool:
+        # Only the first generation (of 1024 bits) fails.
+        assert pool.take(2048, timeout=60).key_size() == 2048
+
+        with pytest.raises(KeyPoolError):
+            pool.take(1024, timeout=60)
+
+    executor.shutdown(wait=True)
@@ -0,0 +1,65 @@
+import pytest
+
+from hks_pylib.cryptography.ciphers.keystore import RSAKeyStore
+from hks_pylib.cryptography.ciphers.asymmetrics import RSAKey, RSACipher
+from hks_pylib.errors.cryptography.ciphers.keystore import KeyStoreFormatError, NotExistKeyError
+
+
+def test_keystore(tmp_path):
+    path = str(tmp_path / "keys.hks")
+    keys = []
+    store = RSAKeyStore(path)
+    for i in range(3):
+        rsakey = RSAKey()
+        rsakey.generate(1024)
+        store.put("tenant-{}".format(i), rsakey, b"password" if i else None)
+        keys.append(rsakey)
+
+    public_only = RSAKey()
+    public_only.deserialize_public_key(keys[0].serialize_public_key())
+    store.put("public", public_only)
+
+    # Replace the key of tenant-2.
+    store.put("tenant-2", keys[0])
+
+    store = RSAKeyStore(path)
+    assert sorted(store.names()) == ["public", "tenant-0", "tenant-1", "tenant-2"]
+    assert store.get("tenant-1", b"password").private_key().private_numbers() \
+        == keys[1].private_key().private_numbers()
+    assert store.get("tenant-2").private_key().private_numbers() \
+        == keys[0].private_key().private_numbers()
+
+    assert store.get("tenant-1", b"password").private_key() is store.get("tenant-1", b"password").private_key()
+
+    public = store.get("public")
+    assert public.private_key() is None
+    cipher = RSACipher(public)
+    cipher.reset()
+    ciphertext = cipher.encrypt(b"huykingsofm")
+    cipher = RSACipher(store.get("tenant-0"))
+    cipher.reset()
+    assert cipher.decrypt(ciphertext) == b"huykingsofm"
+
+    with pytest.raises(NotExistKeyError):
+        store.get("tenant-3")
+
+    with open(path, "r+b") as f:
+        f.truncate(len(f.read()) - 1)
+
+    with pytest.raises(KeyStoreFormatError):
+        RSAKeyStore(path)
+
+
+def test_keystore_invalid_name(tmp_path):
+    path = str(tmp_path / "keys.hks")
+    rsakey = RSAKey()
+    rsakey.generate(1024)
+    RSAKeyStore(path).put("tenant", rsakey)
+
+    with open(path, "r+b") as f:
+        data = f.read()
+        f.seek(data.index(b"tenant"))
+        f.write(b"\xff")
+
+    with pytest.raises(KeyStoreFormatError):
+        RSAKeyStore(path)
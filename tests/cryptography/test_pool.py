@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from hks_pylib.cryptography.ciphers.pool import CipherPool
+from hks_pylib.cryptography.ciphers.symmetrics import AES_CBC, HybridCipher
+
+
+AES_KEY = b"0123456789abcdeffedcba9876543210"
+
+
+def test_cipher_pool():
+    pool = CipherPool(lambda: HybridCipher(AES_CBC(AES_KEY)), max_size=4, initial_size=2)
+    assert pool.idle_size == 2
+
+    def handle(message):
+        with pool.checkout() as cipher:
+            ciphertext = cipher.encrypt(message)
+            cipher.reset(False)
+            return cipher.decrypt(ciphertext)
+
+    messages = [os.urandom(100) for _ in range(200)]
+    with ThreadPoolExecutor(8) as executor:
+        assert list(executor.map(handle, messages)) == messages
+
+    assert pool.hits + pool.misses == 200
+    assert pool.idle_size <= 4
+    assert pool.hit_rate > 0.5
+
+
+def test_cipher_pool_release():
+    pool = CipherPool(lambda: AES_CBC(AES_KEY), max_size=1)
+
+    cipher = pool.acquire()
+    cipher.encrypt(b"huykingsofm", finalize=False)
+    # The unfinished cipher is dropped.
+    pool.release(cipher)
+    assert pool.idle_size == 0
+
+    cipher = pool.acquire()
+    cipher.encrypt(b"huykingsofm")
+    pool.release(cipher)
+    assert pool.idle_size == 1
+    assert pool.acquire() is cipher
+    assert pool.hit_rate == 1 / 3
+
+
+def test_thread_cipher():
+    pool = CipherPool(lambda: AES_CBC(AES_KEY))
+    assert pool.thread_cipher() is pool.thread_cipher()
+
+    with ThreadPoolExecutor(1) as executor:
+        other = executor.submit(pool.thread_cipher).result()
+
+    assert other is not pool.thread_cipher()
@@ -1,4 +1,10 @@
-from hks_pylib.cryptography.protocols import DiffieHellmanExchange
+import time
+import pytest
+from hkserror import HTypeError
+from hkserror.hkserror import HFormatError
+
+from hks_pylib.errors.cryptography import ResetError
+from hks_pylib.cryptography.protocols import DiffieHellmanExchange, EphemeralKeyPool, KeyExchangeMode
 
 def test_DHE():
     P1 = DiffieHellmanExchange()
@@ -19,3 +25,47 @@ def test_DHE():
         assert False
     except:
         pass
+
+
+def test_DHE_parameters_cache():
+    assert DiffieHellmanExchange()._parameters is DiffieHellmanExchange()._parameters
+
+
+def test_DHE_X25519():
+    P1 = DiffieHellmanExchange(mode=KeyExchangeMode.X25519)
+    P2 = DiffieHellmanExchange(mode=KeyExchangeMode.X25519)
+
+    pk1 = P1.public_key
+    pk2 = P2.public_key
+    assert P1.derive_key(P1.exchange(pk2), 32) == P2.derive_key(P2.exchange(pk1), 32)
+
+    with pytest.raises(ResetError):
+        P1.exchange(pk2)
+
+    P1.reset()
+    with pytest.raises(HTypeError):
+        P1.exchange(DiffieHellmanExchange().public_key)
+
+
+@pytest.mark.parametrize('mode', [KeyExchangeMode.FFDH, KeyExchangeMode.X25519])
+def test_DHE_key_pool(mode):
+    with EphemeralKeyPool(mode=mode, high_water=4) as pool:
+        for _ in range(100):
+            if pool.available == 4:
+                break
+            time.sleep(0.1)
+        assert pool.available == 4
+
+        P1 = DiffieHellmanExchange(mode=mode, key_pool=pool)
+        P2 = DiffieHellmanExchange(mode=mode, key_pool=pool)
+        pk1, pk2 = P1.public_key, P2.public_key
+        assert P1.exchange(pk2) == P2.exchange(pk1)
+        assert pool.hits == 2
+
+        with pytest.raises(HFormatError):
+            DiffieHellmanExchange(mode=KeyExchangeMode.X25519 if mode is KeyExchangeMode.FFDH
+                else KeyExchangeMode.FFDH, key_pool=pool)
+
+    assert pool.available == 0
+    assert pool.take() is not None
+    assert pool.misses == 1
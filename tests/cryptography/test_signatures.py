@@ -0,0 +1,58 @@
+import os
+import pytest
+
+from hks_pylib.cryptography.ciphers.asymmetrics import RSAKey
+from hks_pylib.cryptography.ciphers.signatures import Curve, Ed25519Key, ECDSAKey
+from hks_pylib.cryptography.ciphers.signatures import sign, verify, verify_many
+from hks_pylib.errors.cryptography.ciphers.asymmetrics import NotExistPrivateKeyError
+
+
+def new_keys():
+    ed25519_key = Ed25519Key()
+    ed25519_key.generate()
+
+    p256_key = ECDSAKey()
+    p256_key.generate()
+
+    p384_key = ECDSAKey()
+    p384_key.generate(Curve.SECP384R1)
+
+    rsakey = RSAKey()
+    rsakey.generate(1024)
+
+    return [ed25519_key, p256_key, p384_key, rsakey]
+
+
+@pytest.mark.parametrize('key', new_keys())
+def test_sign(key, tmp_path):
+    message = os.urandom(100)
+    signature = sign(key, message)
+    assert verify(key, message, signature)
+    assert not verify(key, message + b"x", signature)
+
+    key.save_all(str(tmp_path), b"password")
+    public_key = type(key)()
+    public_key.load_public_key(str(tmp_path / "public_key.pem"))
+    assert verify(public_key, memoryview(message), signature)
+
+    with pytest.raises(NotExistPrivateKeyError):
+        sign(public_key, message)
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_verify_many(workers):
+    keys = new_keys()
+    items = []
+    expected = []
+    for i in range(50):
+        key = keys[i % len(keys)]
+        message = os.urandom(i)
+        signature = sign(key, message)
+        if i % 7 == 0:
+            message += b"x"
+
+        items.append((message, signature, key))
+        expected.append(i % 7 != 0)
+
+    assert verify_many(items, workers) == expected
+    assert verify_many([], workers) == []
@@ -0,0 +1,81 @@
+import os
+import pytest
+
+from hks_pylib.files.generator import BytesGenerator
+from hks_pylib.cryptography.ciphers.streaming import encrypt_stream, decrypt_stream
+from hks_pylib.cryptography.ciphers.symmetrics import NoCipher, XorCipher
+from hks_pylib.cryptography.ciphers.symmetrics import AES_CBC, AES_CTR, AES_GCM, HybridCipher
+from hks_pylib.cryptography.ciphers.asymmetrics import X25519Key
+from hks_pylib.cryptography.ciphers.envelope import X25519Cipher
+
+
+AES_KEY = b"0123456789abcdeffedcba9876543210"
+
+
+@pytest.mark.parametrize(
+    'cipher',
+    [
+        NoCipher(),
+        XorCipher(os.urandom(100)),
+        AES_CBC(AES_KEY),
+        AES_CTR(AES_KEY),
+        AES_GCM(AES_KEY),
+        HybridCipher(AES_CBC(AES_KEY))
+    ]
+)
+def test_stream(cipher, tmp_path):
+    plaintext = os.urandom(100000)
+    path = tmp_path / "plaintext"
+    path.write_bytes(plaintext)
+
+    cipher.reset()
+    expected = cipher.encrypt(plaintext)
+
+    cipher.reset(False)
+    chunks = list(encrypt_stream(cipher, BytesGenerator(str(path)), buffer_size=3000))
+    assert b"".join(chunks) == expected
+    assert max(len(chunk) for chunk in chunks) <= 3000 + 100
+
+    cipher.reset(False)
+    received = []
+    nbytes = decrypt_stream(cipher, [expected[:10], expected[10:], b""], 1000, received.append)
+    assert nbytes == len(plaintext)
+    assert b"".join(received) == plaintext
+
+
+def test_stream_is_lazy():
+    cipher = AES_CTR(AES_KEY)
+    cipher.reset()
+
+    def source():
+        yield b"huy"
+        raise RuntimeError()
+
+    chunks = encrypt_stream(cipher, source())
+    assert len(next(chunks)) == 3
+    with pytest.raises(RuntimeError):
+        next(chunks)
+
+
+def _x25519_cipher():
+    key = X25519Key()
+    key.generate()
+    return X25519Cipher(key)
+
+
+@pytest.mark.parametrize(
+    'cipher',
+    [
+        AES_CBC(AES_KEY),
+        AES_GCM(AES_KEY),
+        HybridCipher(AES_CBC(AES_KEY)),
+        _x25519_cipher()
+    ]
+)
+def test_empty_stream(cipher):
+    cipher.reset()
+    ciphertext = b"".join(encrypt_stream(cipher, []))
+    assert len(ciphertext) > 0
+
+    cipher.reset(False)
+    assert b"".join(decrypt_stream(cipher, [ciphertext])) == b""
@@ -1,19 +1,41 @@
 import os
+import mmap
 import random
 import pytest
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 
 from cryptography.hazmat.primitives.ciphers.algorithms import AES
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
 
 from hks_pylib import math
+from hks_pylib.cryptography.ciphers import symmetrics
 from hks_pylib.cryptography.ciphers import HKSCipher
 from hks_pylib.cryptography.ciphers.symmetrics import XorCipher, NoCipher
 from hks_pylib.cryptography.ciphers.symmetrics import AES_CBC, AES_CTR, HybridCipher
+from hks_pylib.cryptography.ciphers.symmetrics import AES_GCM, ChaCha20_Poly1305
+from hks_pylib.errors.cryptography.ciphers.symmetrics import UnAuthenticatedPacketError
+from hks_pylib.errors.cryptography.ciphers import BufferIsTooSmallError
 
 
 AES_KEY = b"0123456789abcdeffedcba9876543210"
 PLAIN_TEXT = b"huykingsofm"
 
 
+def new_ciphers():
+    "Return new instances of the ciphers, so that the tests do not share them."
+    return [
+        NoCipher(),
+        XorCipher(os.urandom(100)),
+        AES_CBC(AES_KEY),
+        AES_CTR(AES_KEY),
+        HybridCipher(AES_CBC(AES_KEY)),
+        HybridCipher(AES_CTR(AES_KEY)),
+        AES_GCM(AES_KEY),
+        ChaCha20_Poly1305(AES_KEY)
+    ]
+
+
 @pytest.fixture
 def aes_key():
     return AES_KEY
@@ -58,13 +80,223 @@ def run_cipher(cipher: HKSCipher, plaintext):
         XorCipher(os.urandom(100000)),
         AES_CBC(AES_KEY),
         AES_CTR(AES_KEY),
-        HybridCipher(AES_CBC(AES_KEY))
+        HybridCipher(AES_CBC(AES_KEY)),
+        AES_GCM(AES_KEY),
+        ChaCha20_Poly1305(AES_KEY)
     ]
 )
 def test_cipher(benchmark, cipher, plaintext):
     plaintext = os.urandom(1000)
     benchmark.pedantic(run_cipher, args=(cipher, plaintext), rounds=5)
 
+def test_xor_cipher_stream():
+    key = os.urandom(37)
+    plaintext = os.urandom(37 * 5000)
+
+    cipher = XorCipher(key)
+    cipher.reset()
+    expected = cipher.encrypt(plaintext)
+
+    cipher.reset(False)
+    ciphertext = b""
+    for i in range(0, len(plaintext), 1000):
+        ciphertext += cipher.encrypt(plaintext[i : i + 1000], finalize=False)
+    ciphertext += cipher.finalize()
+    assert ciphertext == expected
+
+    # The last block is only xor-ed with the key.
+    assert ciphertext[-len(key):] == math.bxor(plaintext[-len(key):], key)
+    first_block = math.bxor(math.bxor(plaintext[:len(key)], key), cipher.get_param(0))
+    assert ciphertext[:len(key)] == first_block
+
+    cipher.reset(False)
+    assert cipher.decrypt(ciphertext) == plaintext
+
+@pytest.mark.parametrize('cipher', new_ciphers())
+def test_cipher_into(cipher):
+    plaintext = os.urandom(1000)
+    buffer = bytearray(4096)
+
+    cipher.reset()
+    expected = cipher.encrypt(plaintext)
+
+    cipher.reset(False)
+    nbytes = cipher.encrypt_into(plaintext[:500], buffer, finalize=False)
+    nbytes += cipher.encrypt_into(plaintext[500:], memoryview(buffer)[nbytes:])
+    assert bytes(buffer[:nbytes]) == expected
+
+    cipher.reset(False)
+    nbytes = cipher.decrypt_into(expected, buffer)
+    assert bytes(buffer[:nbytes]) == plaintext
+
+    cipher.reset(False)
+    with pytest.raises(BufferIsTooSmallError):
+        cipher.encrypt_into(plaintext, bytearray(10))
+
+@pytest.mark.parametrize('cipher', new_ciphers())
+def test_cipher_bytes_like(cipher, tmp_path):
+    plaintext = os.urandom(1000)
+    path = tmp_path / "plaintext"
+    path.write_bytes(plaintext)
+
+    cipher.reset()
+    expected = cipher.encrypt(plaintext)
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        cipher.reset(False)
+        ciphertext = cipher.encrypt(view[:300], finalize=False)
+        ciphertext += cipher.encrypt(bytearray(view[300:700]), finalize=False)
+        ciphertext += cipher.encrypt(view[700:])
+        view.release()
+
+    assert ciphertext == expected
+
+    cipher.reset(False)
+    assert cipher.decrypt(memoryview(bytearray(expected))) == plaintext
+
+    cipher.reset(False)
+    with pytest.raises(TypeError):
+        cipher.encrypt("huykingsofm")
+
+    # Their len() does not count bytes.
+    for data in (array("I", range(250)), memoryview(plaintext)[::2]):
+        cipher.reset(False)
+        with pytest.raises(TypeError):
+            cipher.encrypt(data)
+
+@pytest.mark.parametrize(
+    'cipher_cls, reference_cls',
+    [
+        (AES_GCM, AESGCM),
+        (ChaCha20_Poly1305, ChaCha20Poly1305)
+    ]
+)
+def test_aead_cipher(cipher_cls, reference_cls):
+    plaintext = os.urandom(1000)
+    cipher = cipher_cls(AES_KEY)
+    cipher.reset()
+
+    ciphertext = b""
+    for i in range(0, len(plaintext), 70):
+        ciphertext += cipher.encrypt(plaintext[i : i + 70], finalize=False)
+    ciphertext += cipher.finalize()
+
+    reference = reference_cls(AES_KEY)
+    assert ciphertext == reference.encrypt(cipher.get_param(0), plaintext, None)
+
+    cipher.reset(False)
+    computed_plaintext = b""
+    for i in range(0, len(ciphertext), 7):
+        computed_plaintext += cipher.decrypt(ciphertext[i : i + 7], finalize=False)
+    computed_plaintext += cipher.finalize()
+    assert computed_plaintext == plaintext
+
+    tampered = bytearray(ciphertext)
+    tampered[10] ^= 1
+    cipher.reset(False)
+    with pytest.raises(UnAuthenticatedPacketError):
+        cipher.decrypt(tampered)
+
+    cipher.reset(False)
+    with pytest.raises(UnAuthenticatedPacketError):
+        cipher.decrypt(ciphertext[:10])
+
+@pytest.mark.parametrize('nonce', [os.urandom(16), b"\xff" * 16])
+def test_aes_ctr_random_access(nonce):
+    plaintext = os.urandom(10000)
+    cipher = AES_CTR(AES_KEY)
+    cipher.set_param(0, nonce)
+    ciphertext = cipher.encrypt(plaintext)
+
+    for start, end in [(0, 10), (1234, 5000), (16, 32), (9999, 10000)]:
+        assert cipher.decrypt_at(start, ciphertext[start:end]) == plaintext[start:end]
+        assert cipher.encrypt_at(start, plaintext[start:end]) == ciphertext[start:end]
+
+    cipher.reset(False)
+    assert cipher.decrypt(ciphertext[:100], finalize=False) == plaintext[:100]
+    cipher.seek(7777)
+    assert cipher.decrypt(ciphertext[7777:8000], finalize=False) == plaintext[7777:8000]
+    cipher.seek(5)
+    assert cipher.decrypt(ciphertext[5:50]) == plaintext[5:50]
+
+    cipher.reset(False)
+    cipher.seek(4321)
+    assert cipher.encrypt(plaintext[4321:]) == ciphertext[4321:]
+
+def test_aes_ctr_parallel(monkeypatch):
+    monkeypatch.setattr(AES_CTR, "SEGMENT_SIZE", 1000)
+    executors = []
+    monkeypatch.setattr(symmetrics, "ThreadPoolExecutor",
+        lambda workers: executors.append(ThreadPoolExecutor(workers)) or executors[-1])
+    plaintext = os.urandom(100000)
+
+    serial = AES_CTR(AES_KEY)
+    serial.reset()
+    expected = serial.encrypt(plaintext)
+
+    cipher = AES_CTR(AES_KEY, workers=4)
+    cipher.set_param(0, serial.get_param(0))
+    ciphertext = cipher.encrypt(plaintext[:10], finalize=False)
+    ciphertext += cipher.encrypt(plaintext[10:50010], finalize=False)
+    ciphertext += cipher.encrypt(plaintext[50010:50020], finalize=False)
+    buffer = bytearray(len(plaintext))
+    nbytes = cipher.encrypt_into(plaintext[50020:], buffer)
+    ciphertext += bytes(buffer[:nbytes])
+    assert ciphertext == expected
+
+    # One thread pool is shared by the parallel calls of the process,
+    # it is shut down by finalize().
+    assert len(executors) == 1
+    assert cipher._executor is None
+
+    cipher.reset(False)
+    assert cipher.decrypt(expected) == plaintext
+    assert cipher.decrypt_at(333, expected[333:77777]) == plaintext[333:77777]
+
+@pytest.mark.parametrize('cipher_cls', [AES_CTR, AES_CBC])
+@pytest.mark.parametrize('size', [64, 256, 1024, 4096])
+def test_aes_per_message(benchmark, cipher_cls, size):
+    # The OPS column of the benchmark is the number of messages per second.
+    cipher = cipher_cls(AES_KEY)
+    message = os.urandom(size)
+
+    def run():
+        cipher.reset()
+        return cipher.encrypt(message)
+
+    ciphertext = benchmark(run)
+    cipher.reset(False)
+    assert cipher.decrypt(ciphertext) == message
+
+@pytest.mark.parametrize('cipher', new_ciphers())
+def test_cipher_many(cipher):
+    messages = [os.urandom(random.randint(0, 100)) for _ in range(100)]
+    messages.append(b"")
+    messages.append(bytearray(b"huykingsofm"))
+    messages.insert(3, os.urandom(2000))
+
+    pairs = cipher.encrypt_many(messages)
+    assert len(pairs) == len(messages)
+    assert cipher.decrypt_many(pairs) == messages
+
+    # Each pair is also decrypted by the normal way.
+    for i in (0, 3):
+        param, ciphertext = pairs[i]
+        if param is not None:
+            cipher.set_param(0, param)
+        cipher.reset(False)
+        assert cipher.decrypt(ciphertext) == messages[i]
+
+def test_hybrid_cipher_many_authentication():
+    cipher = HybridCipher(AES_CTR(AES_KEY))
+    pairs = cipher.encrypt_many([b"huykingsofm", b"hks_pylib"])
+    iv, ciphertext = pairs[1]
+    pairs[1] = (iv, bytes([ciphertext[0] ^ 1]) + ciphertext[1:])
+
+    with pytest.raises(UnAuthenticatedPacketError):
+        cipher.decrypt_many(pairs)
+
 def test_SIMP():
     length_of_message = random.randint(1000, 2000)
     A = os.urandom(length_of_message)
@@ -1,4 +1,7 @@
+from array import array
+
 from hks_pylib import as_object
+from hks_pylib.utils import is_bytes_like
 
 @as_object.paramterize(b=2)
 class A():
@@ -10,3 +13,12 @@ class A():
 
 def test_as_object():
     A.print(5)
+
+def test_is_bytes_like():
+    assert is_bytes_like(b"abc")
+    assert is_bytes_like(bytearray(b"abc"))
+    assert is_bytes_like(memoryview(b"abc")[1:])
+    assert not is_bytes_like("abc")
+    assert not is_bytes_like(None)
+    assert not is_bytes_like(array("I", [1, 2, 3]))
+    assert not is_bytes_like(memoryview(b"abcdef")[::2])